@@ -0,0 +1,256 @@
+"""
+Prometheus instrumentation: HTTP latency per route, Mongo commands and pool checkout waits,
+plus sampled per-request Mongo accounting (Server-Timing header and slow-request log).
+
+The Mongo listeners have to exist before the client is created, so they live here
+rather than in server.py.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+MONGO_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "cardflow_http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"]
+)
+HTTP_IN_PROGRESS = Gauge("cardflow_http_requests_in_progress", "HTTP requests being served", ["method"])
+MONGO_COMMAND_DURATION = Histogram(
+    "cardflow_mongo_command_duration_seconds", "Mongo command latency by collection and command",
+    ["collection", "command"], buckets=MONGO_BUCKETS
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "cardflow_mongo_command_failures_total", "Mongo commands that returned an error", ["collection", "command"]
+)
+MONGO_POOL_WAIT = Histogram(
+    "cardflow_mongo_pool_checkout_wait_seconds", "Time spent waiting for a pooled Mongo connection",
+    buckets=MONGO_BUCKETS
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    "cardflow_mongo_pool_checkout_failures_total", "Mongo connection checkouts that failed or timed out", ["reason"]
+)
+
+# Set for sampled requests only; Motor copies the context into its executor, so the listener sees it
+current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("current_trace", default=None)
+
+# Where each command keeps the part of its payload that decides which index serves it
+SHAPE_FIELDS = {
+    "find": ("filter", "sort"), "findAndModify": ("query", "sort"), "count": ("query",), "distinct": ("key", "query"),
+    "aggregate": ("pipeline",), "update": ("updates",), "delete": ("deletes",)
+}
+
+def redact(value):
+    """Keep field names and operators, drop values"""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(value[0])] if value else []
+    return "?"
+
+def query_shape(command_name: str, command) -> dict:
+    if command_name == "insert":
+        return {"documents": len(command.get("documents", ()))}
+    shape = {}
+    for field in SHAPE_FIELDS.get(command_name, ()):
+        value = command.get(field)
+        if value is None:
+            continue
+        if field in ("updates", "deletes"):
+            # Bulk writes repeat one statement shape; keep the first and the count
+            shape["q"] = redact(value[0]["q"]) if value else {}
+            shape["n"] = len(value)
+        elif field in ("sort", "key"):
+            shape[field] = value
+        else:
+            shape[field] = redact(value)
+    return shape
+
+class RequestTrace:
+    """Mongo commands issued while serving one request"""
+
+    def __init__(self):
+        self.calls = []  # (collection, command, seconds, shape)
+
+    def record(self, collection: str, command: str, seconds: float, shape: dict):
+        self.calls.append((collection, command, seconds, shape))
+
+    def server_timing(self, elapsed: float) -> str:
+        per_command = defaultdict(lambda: [0, 0.0])
+        for collection, command, seconds, _ in self.calls:
+            entry = per_command[f"{collection}.{command}"]
+            entry[0] += 1
+            entry[1] += seconds
+        parts = [
+            f"app;dur={elapsed * 1000:.1f}",
+            f'db;desc="{len(self.calls)} calls";dur={sum(call[2] for call in self.calls) * 1000:.1f}'
+        ]
+        parts += [f'db.{name};desc="x{count}";dur={seconds * 1000:.1f}' for name, (count, seconds) in per_command.items()]
+        return ", ".join(parts)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command; started/finished events are paired by connection and request id"""
+
+    def __init__(self):
+        self.collections = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        collection = collection if isinstance(collection, str) else "-"
+        trace = current_trace.get()
+        shape = query_shape(event.command_name, event.command) if trace is not None else None
+        self.collections[(event.connection_id, event.request_id)] = (collection, trace, shape)
+
+    def finished(self, event) -> str:
+        collection, trace, shape = self.collections.pop((event.connection_id, event.request_id), ("-", None, None))
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name).observe(seconds)
+        if trace is not None:
+            trace.record(collection, event.command_name, seconds, shape)
+        return collection
+
+    def succeeded(self, event):
+        self.finished(event)
+
+    def failed(self, event):
+        MONGO_COMMAND_FAILURES.labels(self.finished(event), event.command_name).inc()
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Checkout wait time; both events fire on the thread doing the checkout, so a thread-local pairs them"""
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self.local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        MONGO_POOL_WAIT.observe(time.perf_counter() - getattr(self.local, "started", time.perf_counter()))
+
+    def connection_check_out_failed(self, event):
+        MONGO_POOL_WAIT.observe(time.perf_counter() - getattr(self.local, "started", time.perf_counter()))
+        MONGO_POOL_CHECKOUT_FAILURES.labels(event.reason).inc()
+
+    # The remaining pool events are not measured
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_created(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): pass
+    def connection_checked_in(self, event): pass
+
+ROUTE_PATHS = {}
+
+def route_template(scope) -> str:
+    # The router records the matched endpoint in the scope; map it back to its path template
+    app = scope["app"]
+    if app not in ROUTE_PATHS:
+        ROUTE_PATHS[app] = {getattr(route, "endpoint", None): route.path for route in app.routes}
+    return ROUTE_PATHS[app].get(scope.get("endpoint"), "unmatched")
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses are not buffered and latency covers the full body"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_DURATION.labels(method, route_template(scope), str(status[0])).observe(time.perf_counter() - start)
+
+class StatsCollector:
+    """Exposes the numeric fields of the existing stats() dicts as gauges at scrape time"""
+
+    def __init__(self, sources: dict):
+        self.sources = sources
+
+    def collect(self):
+        for component, stats in self.sources.items():
+            for key, value in stats().items():
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    yield GaugeMetricFamily(f"cardflow_{component}_{key}", f"{component} {key.replace('_', ' ')}", value=value)
+
+class TracingMiddleware:
+    """Traces a sample of requests: Server-Timing header with Mongo call counts and time, and
+    query shapes in the slow-request log. Requests outside the sample only get the slow-request
+    log line, without queries.
+
+    A request is slow by its time to response headers, so SSE feeds and streamed exports are not
+    flagged just for staying open."""
+
+    def __init__(self, app, sample_rate: float = 0.0, slow_ms: float = 0.0):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (self.sample_rate or self.slow_ms):
+            return await self.app(scope, receive, send)
+
+        trace = RequestTrace() if self.sample_rate and random.random() < self.sample_rate else None
+        status = [500]
+        start = time.perf_counter()
+        headers_sent = [None]
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                headers_sent[0] = time.perf_counter()
+                if trace is not None:
+                    header = trace.server_timing(time.perf_counter() - start).encode("latin-1")
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+            await send(message)
+
+        token = current_trace.set(trace) if trace is not None else None
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if token is not None:
+                current_trace.reset(token)
+            elapsed = ((headers_sent[0] or time.perf_counter()) - start) * 1000
+            if self.slow_ms and elapsed >= self.slow_ms:
+                entry = {
+                    "event": "slow_request", "method": scope["method"], "route": route_template(scope),
+                    "path": scope["path"], "status": status[0], "duration_ms": round(elapsed, 1)
+                }
+                if trace is not None:
+                    entry["db_calls"] = len(trace.calls)
+                    entry["db_ms"] = round(sum(call[2] for call in trace.calls) * 1000, 1)
+                    entry["queries"] = [
+                        {"collection": collection, "command": command, "ms": round(seconds * 1000, 2), "shape": shape}
+                        for collection, command, seconds, shape in trace.calls
+                    ]
+                logger.warning(json.dumps(entry, default=str))
@@ -0,0 +1,94 @@
+"""
+Convert ISO-string timestamps to native BSON dates.
+
+Safe to stop and re-run at any point: only fields that are still strings are
+selected, so converted rows drop out of the next pass.
+
+Usage: python migrate_datetimes.py [--batch-size N] [collection ...]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DATETIME_FIELDS = {
+    "users": ["created_at"],
+    "user_sessions": ["expires_at", "created_at"],
+    "workspaces": ["created_at", "updated_at"],
+    "boards": ["created_at", "updated_at"],
+    "cards": ["created_at", "updated_at"],
+    "links": ["created_at"],
+}
+
+def parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+async def migrate_field(db, collection: str, field: str, batch_size: int = 1000) -> int:
+    """Convert one string field in bounded batches, walking _id in order"""
+    converted = 0
+    last_id = None
+    while True:
+        query = {field: {"$type": "string"}}
+        if last_id is not None:
+            # Rows that fail to parse stay strings; moving past them keeps the loop finite
+            query["_id"] = {"$gt": last_id}
+        docs = await db[collection].find(query, {"_id": 1, field: 1}).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not docs:
+            return converted
+        last_id = docs[-1]["_id"]
+
+        ops = []
+        for doc in docs:
+            try:
+                value = parse_timestamp(doc[field])
+            except ValueError:
+                logger.warning(f"Skipping {collection} {doc['_id']}: unparseable {field} {doc[field]!r}")
+                continue
+            # Matching on the old value leaves rows rewritten concurrently by the app untouched
+            ops.append(UpdateOne({"_id": doc["_id"], field: doc[field]}, {"$set": {field: value}}))
+        if ops:
+            result = await db[collection].bulk_write(ops, ordered=False)
+            converted += result.modified_count
+        logger.info(f"{collection}.{field}: {converted} converted so far")
+
+async def migrate_collection(db, collection: str, batch_size: int = 1000) -> int:
+    converted = 0
+    for field in DATETIME_FIELDS[collection]:
+        converted += await migrate_field(db, collection, field, batch_size)
+    return converted
+
+async def main(collections: list, batch_size: int):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True)
+    db = client[os.environ['DB_NAME']]
+    try:
+        for collection in collections:
+            converted = await migrate_collection(db, collection, batch_size)
+            logger.info(f"{collection}: {converted} fields converted")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert ISO-string timestamps to BSON dates")
+    parser.add_argument("collections", nargs="*", help=f"any of {', '.join(DATETIME_FIELDS)} (default: all)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    unknown = set(args.collections) - set(DATETIME_FIELDS)
+    if unknown:
+        parser.error(f"unknown collections: {', '.join(sorted(unknown))}")
+    asyncio.run(main(args.collections or list(DATETIME_FIELDS), args.batch_size))
@@ -1,25 +1,41 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import InsertOne, UpdateOne, DeleteOne, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import os
+import re
+import json
+import zlib
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, ValidationError
 from typing import List, Optional, Any
 import uuid
+import time
+import random
+import heapq
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
 from datetime import datetime, timezone, timedelta
 import bcrypt
 import jwt
 import httpx
 
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+from metrics import MetricsMiddleware, MongoCommandMetrics, MongoPoolMetrics, StatsCollector, TracingMiddleware
+from migrate_datetimes import DATETIME_FIELDS, migrate_field
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True, event_listeners=[MongoCommandMetrics(), MongoPoolMetrics()])
 db = client[os.environ['DB_NAME']]
 
 # JWT Secret
@@ -27,6 +43,28 @@ JWT_SECRET = os.environ.get('JWT_SECRET', 'cardflow-secret-key-change-in-product
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_DAYS = 7
 
+# Resolved-user cache; USER_CACHE_TTL_SECONDS bounds how stale a cached user can be (0 disables)
+USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', '30'))
+USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES', '10000'))
+
+# Password hashing runs on a dedicated pool so bcrypt never blocks the event loop
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS', '4'))
+BCRYPT_MAX_QUEUE = int(os.environ.get('BCRYPT_MAX_QUEUE', '64'))
+
+# Google OAuth session exchange; one pooled client for the app's lifetime
+EMERGENT_AUTH_URL = os.environ.get('EMERGENT_AUTH_URL', 'https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data')
+AUTH_CONNECT_TIMEOUT = float(os.environ.get('AUTH_CONNECT_TIMEOUT', '3'))
+AUTH_READ_TIMEOUT = float(os.environ.get('AUTH_READ_TIMEOUT', '10'))
+AUTH_MAX_CONNECTIONS = int(os.environ.get('AUTH_MAX_CONNECTIONS', '20'))
+AUTH_RETRIES = int(os.environ.get('AUTH_RETRIES', '2'))
+AUTH_BACKOFF_MS = float(os.environ.get('AUTH_BACKOFF_MS', '200'))
+
+# Per-request Mongo accounting: fraction of requests traced into a Server-Timing header (0 disables,
+# 1 traces everything), and the time to response headers above which a request is logged (0 disables)
+REQUEST_TRACE_SAMPLE_RATE = float(os.environ.get('REQUEST_TRACE_SAMPLE_RATE', '0'))
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '1000'))
+
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
@@ -68,6 +106,18 @@ class Workspace(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+class DeletionJob(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    job_id: str
+    kind: str
+    target_id: str
+    status: str
+    deleted: dict
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
 class BoardCreate(BaseModel):
     name: str
     description: Optional[str] = ""
@@ -81,6 +131,7 @@ class Board(BaseModel):
     workspace_id: str
     owner_id: str
     statuses: List[dict] = []
+    version: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -129,13 +180,23 @@ class Card(BaseModel):
     due_date: Optional[str] = None
     checklist: List[dict] = []
     color: Optional[str] = None
+    version: int = 0
     created_by: str
     created_at: datetime
     updated_at: datetime
 
+class SearchResult(Card):
+    score: Optional[float] = None
+
+class CardPosition(BaseModel):
+    card_id: str
+    x: float
+    y: float
+
 class LinkCreate(BaseModel):
     source_card_id: str
     target_card_id: str
+    board_id: Optional[str] = None
     link_type: str = "related_to"
     label: Optional[str] = None
     color: Optional[str] = "#6B7280"
@@ -154,6 +215,67 @@ class Link(BaseModel):
     created_by: str
     created_at: datetime
 
+class ImportBoard(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    name: str = "Imported Board"
+    description: Optional[str] = ""
+    statuses: Optional[List[dict]] = None
+
+class ImportCard(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    card_id: Optional[str] = None
+    title: str = ""
+    description: Optional[str] = ""
+    card_type: str = "task"
+    status: str = "idea"
+    position_x: float = 0
+    position_y: float = 0
+    priority: Optional[str] = "medium"
+    assignees: List[str] = []
+    tags: List[str] = []
+    due_date: Optional[str] = None
+    checklist: List[dict] = []
+    color: Optional[str] = None
+
+class ImportLink(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    source_card_id: str
+    target_card_id: str
+    link_type: str = "related_to"
+    label: Optional[str] = None
+    color: Optional[str] = "#6B7280"
+    line_style: str = "solid"
+
+class BoardSnapshot(BaseModel):
+    board: Board
+    cards: List[Card]
+    links: List[Link]
+    cards_next_cursor: Optional[str] = None
+    links_next_cursor: Optional[str] = None
+    version: str
+    sync_token: Optional[str] = None
+
+class SyncOperation(BaseModel):
+    op_id: str
+    entity: str = Field(pattern="^(card|link)$")
+    action: str = Field(pattern="^(create|update|delete)$")
+    board_id: str
+    id: Optional[str] = None
+    data: dict = {}
+    client_ts: datetime
+    base_version: Optional[int] = None
+
+class SyncPush(BaseModel):
+    operations: List[SyncOperation]
+
+class BoardChanges(BaseModel):
+    reset: bool
+    next: str
+    board: Optional[Board] = None
+    cards: List[Card] = []
+    links: List[Link] = []
+    deleted: dict = {}
+
 # Default statuses for new boards
 DEFAULT_STATUSES = [
     {"name": "Idea", "color": "#FBBF24", "order": 0},
@@ -164,14 +286,253 @@ DEFAULT_STATUSES = [
     {"name": "Archived", "color": "#6B7280", "order": 5}
 ]
 
+# Upper bound on cards moved by a single bulk position update
+MAX_POSITION_BATCH = 1000
+
+# Board change feed: per-subscriber queue bound and idle keepalive interval
+EVENT_QUEUE_SIZE = 256
+EVENT_KEEPALIVE_SECONDS = 15
+
+# Opt-in write-behind window for card position updates, in milliseconds (0 writes through)
+POSITION_COALESCE_MS = float(os.environ.get('POSITION_COALESCE_MS', '0'))
+POSITION_FIELDS = {"position_x", "position_y"}
+
+# Exports stream straight from the cursors in chunks of roughly this many bytes
+EXPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# In-memory typeahead indexes for the most recently used boards (0 disables them)
+SUGGEST_MAX_BOARDS = int(os.environ.get('SUGGEST_MAX_BOARDS', '256'))
+SUGGEST_FIELDS = {"title", "tags"}
+
+# Dependency graphs are rebuilt at most once per board version and kept for recently used boards
+GRAPH_CACHE_BOARDS = int(os.environ.get('GRAPH_CACHE_BOARDS', '64'))
+# link_type -> edge direction: "A blocks B" is A before B, "A depends_on B" is B before A
+DEPENDENCY_LINK_TYPES = {"blocks": 1, "depends_on": -1}
+DONE_STATUSES = {"done", "archived"}
+
+# Imports validate records incrementally and insert them in unordered batches
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_ERRORS = 100
+
+# List endpoints page through results by id instead of truncating; workspaces and boards page in
+# creation order (ties broken by id) since ids are random and the dashboard opens the first one
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+
+# Viewport link lookups fan out over at most this many cards
+MAX_VIEWPORT_CARDS = 5000
+
+# Delta sync reaches back SYNC_OVERLAP_SECONDS before the client's token, so writes that land
+# out of timestamp order (including buffered positions) are not missed
+SYNC_OVERLAP_SECONDS = max(5.0, 2 * POSITION_COALESCE_MS / 1000)
+SYNC_TOMBSTONE_DAYS = int(os.environ.get('SYNC_TOMBSTONE_DAYS', '30'))
+SYNC_MAX_CHANGES = 5000
+SYNC_MAX_OPS = 1000
+
+# Deletes hide the workspace or board at once; a background reaper removes the children in throttled batches
+REAPER_BATCH_SIZE = int(os.environ.get('REAPER_BATCH_SIZE', '500'))
+REAPER_PAUSE_MS = float(os.environ.get('REAPER_PAUSE_MS', '100'))
+REAPER_POLL_SECONDS = 5
+REAPER_LEASE_SECONDS = 60
+
+# ==================== INDEXES ====================
+
+# Set INDEX_AUDIT_STRICT=true to refuse to start when a required index is missing
+INDEX_AUDIT_STRICT = os.environ.get('INDEX_AUDIT_STRICT', 'false').lower() == 'true'
+
+# (collection, keys, options, queries served)
+REQUIRED_INDEXES = [
+    ("users", [("user_id", 1)], {"unique": True}, "get_current_user, create_session"),
+    ("users", [("email", 1)], {"unique": True}, "register, login, create_session"),
+    ("user_sessions", [("session_token", 1)], {"unique": True}, "get_current_user, logout"),
+    ("user_sessions", [("user_id", 1)], {}, "create_session (delete previous sessions)"),
+    ("user_sessions", [("expires_at", 1)], {"expireAfterSeconds": 0}, "expire sessions at their expires_at"),
+    ("workspaces", [("workspace_id", 1)], {"unique": True}, "get_workspace, delete_workspace, create_board, import_board"),
+    ("workspaces", [("owner_id", 1), ("created_at", 1), ("workspace_id", 1)], {}, "get_workspaces"),
+    ("boards", [("board_id", 1)], {"unique": True}, "board ownership checks in every board/card/link route"),
+    ("boards", [("owner_id", 1), ("workspace_id", 1), ("created_at", 1), ("board_id", 1)], {}, "get_boards"),
+    ("boards", [("workspace_id", 1)], {}, "delete_workspace, deletion reaper"),
+    ("cards", [("card_id", 1)], {"unique": True}, "get_card, update_card, delete_card, create_link"),
+    ("cards", [("board_id", 1), ("card_id", 1)], {}, "get_cards, get_board_snapshot, export_board, deletion reaper"),
+    ("cards", [("created_by", 1), ("board_id", 1), ("card_id", 1)], {}, "search_cards (substring mode)"),
+    ("cards", [("board_id", 1), ("position_x", 1), ("position_y", 1), ("card_id", 1)], {}, "bbox queries on get_cards, get_links, get_board_snapshot"),
+    ("cards", [("created_by", 1), ("title", "text"), ("description", "text"), ("tags", "text")],
+     {"name": "cards_text_search", "weights": {"title": 10, "tags": 5, "description": 1}}, "search_cards (text mode)"),
+    ("links", [("link_id", 1)], {"unique": True}, "delete_link"),
+    ("links", [("board_id", 1), ("link_id", 1)], {}, "get_links, get_board_snapshot, export_board, deletion reaper"),
+    ("links", [("source_card_id", 1), ("target_card_id", 1)], {"unique": True, "name": "links_source_target_unique"}, "create_link (duplicate guard), delete_card"),
+    ("links", [("target_card_id", 1)], {}, "delete_card"),
+    ("cards", [("board_id", 1), ("updated_at", 1)], {}, "board_changes"),
+    ("links", [("board_id", 1), ("created_at", 1)], {}, "board_changes"),
+    ("tombstones", [("board_id", 1), ("deleted_at", 1)], {}, "board_changes"),
+    ("tombstones", [("deleted_at", 1)], {"expireAfterSeconds": SYNC_TOMBSTONE_DAYS * 24 * 3600}, "expire tombstones older than any valid sync token"),
+    ("delete_jobs", [("job_id", 1)], {"unique": True}, "get_deletion, deletion reaper progress"),
+    ("delete_jobs", [("status", 1), ("lease_until", 1)], {}, "deletion reaper (claim next job)"),
+    ("delete_jobs", [("finished_at", 1)], {"expireAfterSeconds": 7 * 24 * 3600}, "expire finished deletion jobs after a week"),
+]
+
+# Superseded indexes: same keys as a required one (they must go before it can be built) or replaced by one
+RETIRED_INDEXES = [
+    ("links", "source_card_id_1_target_card_id_1"),
+    ("workspaces", "owner_id_1_workspace_id_1"),
+    ("boards", "owner_id_1_workspace_id_1_board_id_1"),
+]
+
+def index_name(keys: list, options: dict) -> str:
+    # Same naming scheme pymongo uses when no explicit name is given
+    return options.get("name") or "_".join(f"{field}_{direction}" for field, direction in keys)
+
+async def ensure_indexes():
+    for collection, name in RETIRED_INDEXES:
+        if name in await db[collection].index_information():
+            logger.info(f"Dropping retired index {collection}.{name}")
+            await db[collection].drop_index(name)
+    for collection, keys, options, _ in REQUIRED_INDEXES:
+        try:
+            await db[collection].create_index(keys, **options)
+        except Exception as e:
+            logger.error(f"Failed to create index {collection}.{index_name(keys, options)}: {e}")
+
+async def audit_indexes() -> List[str]:
+    """Log which queries each index serves and return the ones that are missing"""
+    existing = {}
+    missing = []
+    for collection, keys, options, serves in REQUIRED_INDEXES:
+        if collection not in existing:
+            existing[collection] = await db[collection].index_information()
+        name = index_name(keys, options)
+        info = existing[collection].get(name)
+        if not info or bool(info.get("unique")) != bool(options.get("unique")):
+            missing.append(f"{collection}.{name}")
+            logger.warning(f"Missing index {collection}.{name} (serves: {serves})")
+        else:
+            logger.info(f"Index {collection}.{name} serves: {serves}")
+    return missing
+
+# ==================== PAGINATION ====================
+
+# Rows not yet converted by migrate_datetimes.py still hold ISO strings; BSON sorts every string
+# before every date, so the cursor records which kind the last row had
+def encode_created_cursor(doc: dict, key: str) -> str:
+    created_at = doc["created_at"]
+    if isinstance(created_at, datetime):
+        return f"d:{created_at.isoformat()}|{doc[key]}"
+    return f"s:{created_at}|{doc[key]}"
+
+def created_after(cursor: str, key: str) -> dict:
+    kind, _, rest = cursor.partition(":")
+    created_at, separator, last_id = rest.rpartition("|")
+    if kind not in ("d", "s") or not separator:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if kind == "d":
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+    branches = [{"created_at": {"$gt": created_at}}, {"created_at": created_at, key: {"$gt": last_id}}]
+    if kind == "s":
+        # $gt only compares within a type, so the converted rows are reached separately
+        branches.append({"created_at": {"$type": "date"}})
+    return {"$or": branches}
+
+async def fetch_page(collection, query: dict, key: str, limit: int, cursor: Optional[str] = None, by_created: bool = False):
+    """Keyset page ordered by a unique id field, or by (created_at, id) when by_created; returns (docs, next_cursor)"""
+    if cursor and by_created:
+        query = {**query, **created_after(cursor, key)}
+    elif cursor:
+        query = {**query, key: {"$gt": cursor}}
+    order = [("created_at", 1), (key, 1)] if by_created else [(key, 1)]
+    docs = await collection.find(query, {"_id": 0}).sort(order).limit(limit + 1).to_list(limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, encode_created_cursor(docs[-1], key) if by_created else docs[-1][key]
+    return docs, None
+
+async def paginate(collection, query: dict, key: str, limit: int, cursor: Optional[str], response: Response, by_created: bool = False) -> List[dict]:
+    docs, next_cursor = await fetch_page(collection, query, key, limit, cursor, by_created)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return docs
+
+# ==================== VIEWPORT ====================
+
+def parse_bbox(bbox: Optional[str]) -> Optional[tuple]:
+    """'x1,y1,x2,y2' in canvas coordinates, corners in either order"""
+    if bbox is None:
+        return None
+    try:
+        x1, y1, x2, y2 = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be x1,y1,x2,y2")
+    return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+
+def viewport_query(board_id: str, bbox: Optional[tuple]) -> dict:
+    query = {"board_id": board_id}
+    if bbox:
+        x1, y1, x2, y2 = bbox
+        query["position_x"] = {"$gte": x1, "$lte": x2}
+        query["position_y"] = {"$gte": y1, "$lte": y2}
+    return query
+
+def in_viewport(card: dict, bbox: Optional[tuple]) -> bool:
+    if not bbox:
+        return True
+    x1, y1, x2, y2 = bbox
+    return x1 <= card["position_x"] <= x2 and y1 <= card["position_y"] <= y2
+
+async def viewport_link_query(board_id: str, bbox: Optional[tuple]) -> dict:
+    """Links with at least one end on a card inside the viewport"""
+    if not bbox:
+        return {"board_id": board_id}
+    # Covered by the (board_id, position_x, position_y, card_id) index
+    docs = await db.cards.find(viewport_query(board_id, bbox), {"_id": 0, "card_id": 1}).limit(MAX_VIEWPORT_CARDS + 1).to_list(MAX_VIEWPORT_CARDS + 1)
+    if len(docs) > MAX_VIEWPORT_CARDS:
+        raise HTTPException(status_code=400, detail=f"More than {MAX_VIEWPORT_CARDS} cards in bbox; narrow it or page links without bbox")
+    card_ids = [doc["card_id"] for doc in docs]
+    return {"board_id": board_id, "$or": [{"source_card_id": {"$in": card_ids}}, {"target_card_id": {"$in": card_ids}}]}
+
+async def fetch_viewport_links(board_id: str, viewport: Optional[tuple]):
+    return await fetch_page(db.links, await viewport_link_query(board_id, viewport), "link_id", MAX_PAGE_SIZE)
+
+def overlay_viewport(cards: List[dict], bbox: Optional[tuple]) -> List[dict]:
+    # Buffered moves can carry a card out of the viewport before they reach the database
+    for card in cards:
+        position_buffer.overlay(card)
+    if bbox and position_buffer.enabled:
+        cards = [card for card in cards if in_viewport(card, bbox)]
+    return cards
+
 # ==================== AUTH HELPERS ====================
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+bcrypt_pending = 0
 
-def verify_password(password: str, hashed: str) -> bool:
+async def run_bcrypt(fn, *args):
+    # Shed load instead of queueing logins without bound behind the pool
+    global bcrypt_pending
+    if bcrypt_pending >= BCRYPT_MAX_QUEUE:
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
+    bcrypt_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(bcrypt_executor, fn, *args)
+    finally:
+        bcrypt_pending -= 1
+
+def _hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+def _verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+async def hash_password(password: str) -> str:
+    return await run_bcrypt(_hash_password, password)
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await run_bcrypt(_verify_password, password, hashed)
+
 def create_jwt_token(user_id: str) -> str:
     payload = {
         'user_id': user_id,
@@ -188,33 +549,194 @@ def decode_jwt_token(token: str) -> dict:
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+class UserCache:
+    """In-process LRU of resolved users with a per-entry TTL"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()  # key -> (expires_at_monotonic, user)
+        self.keys_by_user = {}  # user_id -> set of keys
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: tuple) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: tuple, user: dict, max_age: Optional[float] = None):
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds if max_age is None else min(self.ttl_seconds, max_age)
+        if ttl <= 0:
+            return
+        self._remove(key)
+        self.entries[key] = (time.monotonic() + ttl, user)
+        self.keys_by_user.setdefault(user["user_id"], set()).add(key)
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)))
+
+    def invalidate(self, key: tuple):
+        self._remove(key)
+
+    def invalidate_user(self, user_id: str):
+        for key in list(self.keys_by_user.get(user_id, ())):
+            self._remove(key)
+
+    def _remove(self, key: tuple):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self.keys_by_user.get(entry[1]["user_id"])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.keys_by_user[entry[1]["user_id"]]
+
+    def stats(self) -> dict:
+        return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+user_cache = UserCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS)
+
 async def get_current_user(request: Request) -> dict:
     # Check cookie first for Google OAuth
     session_token = request.cookies.get("session_token")
     if session_token:
-        session = await db.user_sessions.find_one({"session_token": session_token}, {"_id": 0})
+        cache_key = ("session", session_token)
+        user = user_cache.get(cache_key)
+        if user:
+            return user
+        # The TTL monitor only sweeps once a minute, so expiry is also part of the filter
+        now = datetime.now(timezone.utc)
+        session = await db.user_sessions.find_one(
+            {"session_token": session_token, "expires_at": {"$gt": now}},
+            {"_id": 0, "user_id": 1, "expires_at": 1}
+        )
         if session:
-            expires_at = session.get("expires_at")
-            if isinstance(expires_at, str):
-                expires_at = datetime.fromisoformat(expires_at)
-            if expires_at.tzinfo is None:
-                expires_at = expires_at.replace(tzinfo=timezone.utc)
-            if expires_at > datetime.now(timezone.utc):
-                user = await db.users.find_one({"user_id": session["user_id"]}, {"_id": 0})
-                if user:
-                    return user
+            user = await db.users.find_one({"user_id": session["user_id"]}, {"_id": 0})
+            if user:
+                user_cache.set(cache_key, user, max_age=(session["expires_at"] - now).total_seconds())
+                return user
     
     # Check Authorization header for JWT
     auth_header = request.headers.get("Authorization")
     if auth_header and auth_header.startswith("Bearer "):
         token = auth_header.split(" ")[1]
         payload = decode_jwt_token(token)
+        cache_key = ("jwt", payload["user_id"])
+        user = user_cache.get(cache_key)
+        if user:
+            return user
         user = await db.users.find_one({"user_id": payload["user_id"]}, {"_id": 0})
         if user:
+            user_cache.set(cache_key, user)
             return user
     
     raise HTTPException(status_code=401, detail="Not authenticated")
 
+# ==================== AUTH PROVIDER ====================
+
+class AuthProviderClient:
+    """Pooled keep-alive client for the OAuth session exchange.
+
+    Connect and read timeouts are explicit, the pool caps concurrent upstream calls, and
+    transport errors, 429s and 5xx responses are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, url: str, connect_timeout: float, read_timeout: float, max_connections: int,
+                 retries: int, backoff_ms: float, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url = url
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout, pool=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.retries = retries
+        self.backoff = backoff_ms / 1000
+        self.transport = transport
+        self.client: Optional[httpx.AsyncClient] = None
+        self.latencies = deque(maxlen=1000)
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+
+    def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, transport=self.transport)
+
+    async def stop(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def get(self, session_id: str) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            return await self.client.get(self.url, headers={"X-Session-ID": session_id})
+        finally:
+            self.requests += 1
+            self.latencies.append(time.perf_counter() - start)
+
+    async def session_data(self, session_id: str) -> Optional[dict]:
+        """User data for an OAuth session, or None if the provider rejects it"""
+        self.start()
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retried += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+            try:
+                response = await self.get(session_id)
+            except httpx.PoolTimeout:
+                # Every pooled connection is busy; shed load like the bcrypt queue does
+                self.failures += 1
+                raise HTTPException(status_code=503, detail="Server busy, please retry")
+            except httpx.TransportError as e:
+                logger.warning(f"Auth provider request failed (attempt {attempt + 1}): {e!r}")
+                continue
+            if response.status_code == 429 or response.status_code >= 500:
+                logger.warning(f"Auth provider returned {response.status_code} (attempt {attempt + 1})")
+                continue
+            if response.status_code != 200:
+                return None
+            return response.json()
+        self.failures += 1
+        raise HTTPException(status_code=502, detail="Auth provider unavailable")
+
+    def stats(self) -> dict:
+        ordered = sorted(self.latencies)
+        def pct(p: float) -> Optional[float]:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1) if ordered else None
+        return {
+            "requests": self.requests,
+            "retried": self.retried,
+            "failures": self.failures,
+            "p50_ms": pct(0.5),
+            "p99_ms": pct(0.99)
+        }
+
+auth_provider = AuthProviderClient(
+    EMERGENT_AUTH_URL, AUTH_CONNECT_TIMEOUT, AUTH_READ_TIMEOUT, AUTH_MAX_CONNECTIONS, AUTH_RETRIES, AUTH_BACKOFF_MS
+)
+
+async def backfill_session_expiry():
+    """Convert legacy string timestamps on sessions so the TTL index and the lookup filter see them"""
+    for field in DATETIME_FIELDS["user_sessions"]:
+        await migrate_field(db, "user_sessions", field)
+    # Whatever is still not a date could never expire or match a lookup
+    result = await db.user_sessions.delete_many({"expires_at": {"$not": {"$type": "date"}}})
+    if result.deleted_count:
+        logger.warning(f"Removed {result.deleted_count} sessions without a valid expires_at")
+
 # ==================== AUTH ROUTES ====================
 
 @api_router.post("/auth/register")
@@ -224,7 +746,7 @@ async def register(user_data: UserCreate):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     user_id = f"user_{uuid.uuid4().hex[:12]}"
-    hashed_pw = hash_password(user_data.password)
+    hashed_pw = await hash_password(user_data.password)
     
     user_doc = {
         "user_id": user_id,
@@ -232,7 +754,7 @@ async def register(user_data: UserCreate):
         "name": user_data.name,
         "password": hashed_pw,
         "picture": None,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
     await db.users.insert_one(user_doc)
     
@@ -253,7 +775,7 @@ async def login(credentials: UserLogin):
     if not user or not user.get("password"):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    if not verify_password(credentials.password, user["password"]):
+    if not await verify_password(credentials.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     token = create_jwt_token(user["user_id"])
@@ -275,15 +797,9 @@ async def create_session(request: Request, response: Response):
         raise HTTPException(status_code=400, detail="Session ID required")
     
     # Fetch user data from Emergent Auth
-    async with httpx.AsyncClient() as client:
-        auth_response = await client.get(
-            "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
-            headers={"X-Session-ID": session_id}
-        )
-        if auth_response.status_code != 200:
-            raise HTTPException(status_code=401, detail="Invalid session")
-        
-        auth_data = auth_response.json()
+    auth_data = await auth_provider.session_data(session_id)
+    if auth_data is None:
+        raise HTTPException(status_code=401, detail="Invalid session")
     
     # Check if user exists
     user = await db.users.find_one({"email": auth_data["email"]}, {"_id": 0})
@@ -298,6 +814,7 @@ async def create_session(request: Request, response: Response):
                 "picture": auth_data.get("picture")
             }}
         )
+        user_cache.invalidate_user(user_id)
     else:
         # Create new user
         user_id = f"user_{uuid.uuid4().hex[:12]}"
@@ -306,7 +823,7 @@ async def create_session(request: Request, response: Response):
             "email": auth_data["email"],
             "name": auth_data["name"],
             "picture": auth_data.get("picture"),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         await db.users.insert_one(user_doc)
     
@@ -318,8 +835,8 @@ async def create_session(request: Request, response: Response):
     await db.user_sessions.insert_one({
         "user_id": user_id,
         "session_token": session_token,
-        "expires_at": expires_at.isoformat(),
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "expires_at": expires_at,
+        "created_at": datetime.now(timezone.utc)
     })
     
     # Set cookie
@@ -354,16 +871,171 @@ async def logout(request: Request, response: Response):
     session_token = request.cookies.get("session_token")
     if session_token:
         await db.user_sessions.delete_many({"session_token": session_token})
+        user_cache.invalidate(("session", session_token))
     
     response.delete_cookie(key="session_token", path="/")
     return {"message": "Logged out"}
 
+# ==================== DELETION REAPER ====================
+
+def not_deleted(query: dict) -> dict:
+    # Soft-deleted workspaces and boards stay invisible while the reaper removes them
+    return {**query, "deleted_at": None}
+
+class DeletionReaper:
+    """Removes the children of soft-deleted workspaces and boards in throttled batches.
+
+    Jobs live in the delete_jobs collection and are claimed with a lease, so a job
+    interrupted by a crash or restart is picked up again once the lease runs out.
+    Every step is idempotent: a resumed job just deletes whatever is left.
+    """
+
+    def __init__(self, batch_size: int, pause_ms: float):
+        self.batch_size = batch_size
+        self.pause = pause_ms / 1000
+        self.active = None
+        self.completed = 0
+        self.deleted = {"boards": 0, "cards": 0, "links": 0}
+        self._wake = asyncio.Event()
+        self._task = None
+
+    async def enqueue(self, kind: str, target_id: str, owner_id: str) -> dict:
+        now = datetime.now(timezone.utc)
+        job = {
+            "job_id": f"del_{uuid.uuid4().hex[:12]}",
+            "kind": kind,
+            "target_id": target_id,
+            "owner_id": owner_id,
+            "status": "pending",
+            "deleted": {"boards": 0, "cards": 0, "links": 0},
+            "error": None,
+            "lease_until": now,
+            "created_at": now,
+            "updated_at": now,
+            "finished_at": None
+        }
+        # The job is recorded before anything is hidden, so a crash in between still gets reaped
+        await db.delete_jobs.insert_one(job)
+        job.pop("_id", None)
+        await self.hide(job)
+        self._wake.set()
+        return job
+
+    async def hide(self, job: dict):
+        now = datetime.now(timezone.utc)
+        if job["kind"] == "workspace":
+            await db.workspaces.update_one(not_deleted({"workspace_id": job["target_id"]}), {"$set": {"deleted_at": now}})
+            await db.boards.update_many(not_deleted({"workspace_id": job["target_id"]}), {"$set": {"deleted_at": now}})
+        else:
+            await db.boards.update_one(not_deleted({"board_id": job["target_id"]}), {"$set": {"deleted_at": now}})
+
+    async def claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await db.delete_jobs.find_one_and_update(
+            {"status": {"$in": ["pending", "running"]}, "lease_until": {"$lte": now}},
+            {"$set": {"status": "running", "lease_until": now + timedelta(seconds=REAPER_LEASE_SECONDS), "updated_at": now}},
+            sort=[("lease_until", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def checkpoint(self, job: dict, kind: str, count: int):
+        # Records progress and renews the lease in the same write
+        self.deleted[kind] += count
+        now = datetime.now(timezone.utc)
+        await db.delete_jobs.update_one(
+            {"job_id": job["job_id"]},
+            {"$inc": {f"deleted.{kind}": count},
+             "$set": {"lease_until": now + timedelta(seconds=REAPER_LEASE_SECONDS), "updated_at": now}}
+        )
+
+    async def reap_board(self, job: dict, board_id: str):
+        for kind in ("cards", "links"):
+            while True:
+                docs = await db[kind].find({"board_id": board_id}, {"_id": 1}).limit(self.batch_size).to_list(self.batch_size)
+                if not docs:
+                    break
+                result = await db[kind].delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+                await self.checkpoint(job, kind, result.deleted_count)
+                # Yield to interactive traffic between batches
+                await asyncio.sleep(self.pause)
+        result = await db.boards.delete_one({"board_id": board_id})
+        suggest_indexes.drop(board_id)
+        await self.checkpoint(job, "boards", result.deleted_count)
+
+    async def process(self, job: dict):
+        self.active = job["job_id"]
+        try:
+            await self.hide(job)
+            if job["kind"] == "workspace":
+                while True:
+                    boards = await db.boards.find({"workspace_id": job["target_id"]}, {"_id": 0, "board_id": 1}).limit(self.batch_size).to_list(self.batch_size)
+                    if not boards:
+                        break
+                    for board in boards:
+                        await self.reap_board(job, board["board_id"])
+                await db.workspaces.delete_one({"workspace_id": job["target_id"]})
+            else:
+                await self.reap_board(job, job["target_id"])
+            now = datetime.now(timezone.utc)
+            await db.delete_jobs.update_one(
+                {"job_id": job["job_id"]},
+                {"$set": {"status": "done", "error": None, "updated_at": now, "finished_at": now}}
+            )
+            self.completed += 1
+        except Exception as e:
+            # Left running; another pass picks it up once the lease expires
+            logger.error(f"Deletion job {job['job_id']} failed, will retry: {e}")
+            await db.delete_jobs.update_one({"job_id": job["job_id"]}, {"$set": {"error": str(e)}})
+        finally:
+            self.active = None
+
+    async def _run(self):
+        while True:
+            try:
+                job = await self.claim()
+                if job:
+                    await self.process(job)
+                    continue
+            except Exception as e:
+                logger.error(f"Deletion reaper error: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), REAPER_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"active_job": self.active, "completed": self.completed, "deleted": self.deleted}
+
+deletion_reaper = DeletionReaper(REAPER_BATCH_SIZE, REAPER_PAUSE_MS)
+
+@api_router.get("/deletions/{job_id}", response_model=DeletionJob)
+async def get_deletion(job_id: str, user: dict = Depends(get_current_user)):
+    job = await db.delete_jobs.find_one({"job_id": job_id, "owner_id": user["user_id"]}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+    return job
+
 # ==================== WORKSPACE ROUTES ====================
 
 @api_router.post("/workspaces", response_model=Workspace)
 async def create_workspace(data: WorkspaceCreate, user: dict = Depends(get_current_user)):
     workspace_id = f"ws_{uuid.uuid4().hex[:12]}"
-    now = datetime.now(timezone.utc).isoformat()
+    now = datetime.now(timezone.utc)
     
     workspace_doc = {
         "workspace_id": workspace_id,
@@ -375,57 +1047,231 @@ async def create_workspace(data: WorkspaceCreate, user: dict = Depends(get_curre
         "updated_at": now
     }
     await db.workspaces.insert_one(workspace_doc)
-    
-    result = await db.workspaces.find_one({"workspace_id": workspace_id}, {"_id": 0})
-    result["created_at"] = datetime.fromisoformat(result["created_at"])
-    result["updated_at"] = datetime.fromisoformat(result["updated_at"])
-    return result
+    # insert_one stamps the generated _id onto the dict
+    workspace_doc.pop("_id", None)
+    return workspace_doc
 
 @api_router.get("/workspaces", response_model=List[Workspace])
-async def get_workspaces(user: dict = Depends(get_current_user)):
-    workspaces = await db.workspaces.find({"owner_id": user["user_id"]}, {"_id": 0}).to_list(100)
-    for ws in workspaces:
-        if isinstance(ws["created_at"], str):
-            ws["created_at"] = datetime.fromisoformat(ws["created_at"])
-        if isinstance(ws["updated_at"], str):
-            ws["updated_at"] = datetime.fromisoformat(ws["updated_at"])
+async def get_workspaces(response: Response, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, user: dict = Depends(get_current_user)):
+    workspaces = await paginate(db.workspaces, not_deleted({"owner_id": user["user_id"]}), "workspace_id", limit, cursor, response, by_created=True)
     return workspaces
 
 @api_router.get("/workspaces/{workspace_id}", response_model=Workspace)
 async def get_workspace(workspace_id: str, user: dict = Depends(get_current_user)):
-    ws = await db.workspaces.find_one({"workspace_id": workspace_id, "owner_id": user["user_id"]}, {"_id": 0})
+    ws = await db.workspaces.find_one(not_deleted({"workspace_id": workspace_id, "owner_id": user["user_id"]}), {"_id": 0})
     if not ws:
         raise HTTPException(status_code=404, detail="Workspace not found")
-    if isinstance(ws["created_at"], str):
-        ws["created_at"] = datetime.fromisoformat(ws["created_at"])
-    if isinstance(ws["updated_at"], str):
-        ws["updated_at"] = datetime.fromisoformat(ws["updated_at"])
     return ws
 
 @api_router.delete("/workspaces/{workspace_id}")
 async def delete_workspace(workspace_id: str, user: dict = Depends(get_current_user)):
-    result = await db.workspaces.delete_one({"workspace_id": workspace_id, "owner_id": user["user_id"]})
-    if result.deleted_count == 0:
+    ws = await db.workspaces.find_one(not_deleted({"workspace_id": workspace_id, "owner_id": user["user_id"]}), {"_id": 1})
+    if not ws:
         raise HTTPException(status_code=404, detail="Workspace not found")
-    # Delete all boards and cards in workspace
-    boards = await db.boards.find({"workspace_id": workspace_id}, {"board_id": 1, "_id": 0}).to_list(1000)
-    board_ids = [b["board_id"] for b in boards]
-    await db.boards.delete_many({"workspace_id": workspace_id})
-    await db.cards.delete_many({"board_id": {"$in": board_ids}})
-    await db.links.delete_many({"board_id": {"$in": board_ids}})
-    return {"message": "Workspace deleted"}
+    # Hidden immediately; boards, cards and links are removed in the background
+    job = await deletion_reaper.enqueue("workspace", workspace_id, user["user_id"])
+    return {"message": "Workspace deleted", "job_id": job["job_id"]}
+
+# ==================== POSITION WRITE BUFFER ====================
+
+class PositionWriteBuffer:
+    """Coalesces bursts of card position updates into periodic bulk writes"""
+
+    def __init__(self, window_ms: float):
+        self.window = window_ms / 1000
+        self.pending = {}  # card_id -> {"board_id", "position_x", "position_y", "updated_at"}
+        self.flushing = {}
+        self.revisions = {}  # board_id -> count of buffered writes, part of the board ETag
+        self.received = 0
+        self.collapsed = 0
+        self.flushed = 0
+        self._task = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def add(self, card_id: str, board_id: str, fields: dict):
+        self.received += 1
+        self.revisions[board_id] = self.revisions.get(board_id, 0) + 1
+        entry = self.pending.get(card_id)
+        if entry is None or entry["board_id"] != board_id:
+            self.pending[card_id] = {"board_id": board_id, **fields}
+        else:
+            self.collapsed += 1
+            entry.update(fields)
+
+    def discard(self, card_id: str):
+        self.pending.pop(card_id, None)
+
+    def take(self, card_id: str, board_id: str) -> dict:
+        """Remove a card's unflushed fields so a full update can write them itself"""
+        entry = self.pending.pop(card_id, None)
+        if not entry or entry["board_id"] != board_id:
+            return {}
+        return {k: v for k, v in entry.items() if k != "board_id"}
+
+    def overlay(self, card: dict) -> dict:
+        # Read-your-writes: positions accepted but not yet flushed win over the stored document
+        entry = self.pending.get(card["card_id"]) or self.flushing.get(card["card_id"])
+        if entry and entry["board_id"] == card["board_id"]:
+            card.update({k: v for k, v in entry.items() if k != "board_id"})
+        return card
+
+    async def flush(self):
+        if not self.pending:
+            return
+        self.flushing, self.pending = self.pending, {}
+        try:
+            await db.cards.bulk_write([
+                UpdateOne(
+                    {"card_id": card_id, "board_id": entry["board_id"]},
+                    {"$set": {k: v for k, v in entry.items() if k != "board_id"}, "$inc": {"version": 1}}
+                )
+                for card_id, entry in self.flushing.items()
+            ], ordered=False)
+            self.flushed += len(self.flushing)
+            board_ids = list({entry["board_id"] for entry in self.flushing.values()})
+            await db.boards.update_many({"board_id": {"$in": board_ids}}, {"$inc": {"version": 1}})
+            for board_id in board_ids:
+                suggest_indexes.bumped(board_id)
+        except Exception as e:
+            logger.error(f"Position flush failed, retrying {len(self.flushing)} cards: {e}")
+            for card_id, entry in self.flushing.items():
+                newer = self.pending.get(card_id)
+                self.pending[card_id] = {**entry, **newer} if newer else entry
+        finally:
+            self.flushing = {}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.window)
+            await self.flush()
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self.pending),
+            "received": self.received,
+            "collapsed": self.collapsed,
+            "flushed": self.flushed
+        }
+
+position_buffer = PositionWriteBuffer(POSITION_COALESCE_MS)
+
+# ==================== BOARD VERSIONS ====================
+
+async def bump_board_version(board_id: str) -> Optional[int]:
+    # Call only after the write itself has landed, so a reader never pairs a new ETag with old data
+    board = await db.boards.find_one_and_update(
+        {"board_id": board_id},
+        {"$inc": {"version": 1}},
+        projection={"_id": 0, "version": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not board:
+        return None
+    suggest_indexes.bumped(board_id)
+    return board["version"]
+
+def board_etag(board: dict) -> str:
+    board_id = board["board_id"]
+    return f'"{board_id}-{board.get("version", 0)}-{position_buffer.revisions.get(board_id, 0)}"'
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response when the client's If-None-Match already names the current ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    return None
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+# ==================== BOARD EVENTS ====================
+
+class LocalEventBroker:
+    """In-process fan-out of board change events.
+
+    A broker shared between workers (e.g. backed by Redis pub/sub) only needs
+    the same publish/subscribe/unsubscribe methods and can replace event_broker.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscribers = {}  # board_id -> set of asyncio.Queue
+
+    async def publish(self, board_id: str, event: dict):
+        for queue in list(self.subscribers.get(board_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A subscriber that fell behind gets one resync marker instead of an unbounded backlog
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync", "board_id": board_id})
+
+    def subscribe(self, board_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.setdefault(board_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, board_id: str, queue: asyncio.Queue):
+        queues = self.subscribers.get(board_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[board_id]
+
+event_broker = LocalEventBroker(EVENT_QUEUE_SIZE)
+
+async def publish_board_event(board_id: str, event_type: str, version: Optional[int] = None, **payload):
+    await event_broker.publish(board_id, {"type": event_type, "board_id": board_id, "version": version, **payload})
+
+async def board_event_stream(request: Request, board_id: str, queue: asyncio.Queue):
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), EVENT_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {dumps(event)}\n\n"
+    finally:
+        event_broker.unsubscribe(board_id, queue)
 
 # ==================== BOARD ROUTES ====================
 
 @api_router.post("/boards", response_model=Board)
 async def create_board(data: BoardCreate, user: dict = Depends(get_current_user)):
     # Verify workspace ownership
-    ws = await db.workspaces.find_one({"workspace_id": data.workspace_id, "owner_id": user["user_id"]}, {"_id": 0})
+    ws = await db.workspaces.find_one(not_deleted({"workspace_id": data.workspace_id, "owner_id": user["user_id"]}), {"_id": 1})
     if not ws:
         raise HTTPException(status_code=404, detail="Workspace not found")
     
     board_id = f"board_{uuid.uuid4().hex[:12]}"
-    now = datetime.now(timezone.utc).isoformat()
+    now = datetime.now(timezone.utc)
     
     board_doc = {
         "board_id": board_id,
@@ -434,75 +1280,157 @@ async def create_board(data: BoardCreate, user: dict = Depends(get_current_user)
         "workspace_id": data.workspace_id,
         "owner_id": user["user_id"],
         "statuses": DEFAULT_STATUSES,
+        "version": 0,
         "created_at": now,
         "updated_at": now
     }
     await db.boards.insert_one(board_doc)
-    
-    result = await db.boards.find_one({"board_id": board_id}, {"_id": 0})
-    result["created_at"] = datetime.fromisoformat(result["created_at"])
-    result["updated_at"] = datetime.fromisoformat(result["updated_at"])
-    return result
+    board_doc.pop("_id", None)
+    return board_doc
 
 @api_router.get("/boards", response_model=List[Board])
-async def get_boards(workspace_id: Optional[str] = None, user: dict = Depends(get_current_user)):
-    query = {"owner_id": user["user_id"]}
+async def get_boards(response: Response, workspace_id: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, user: dict = Depends(get_current_user)):
+    query = not_deleted({"owner_id": user["user_id"]})
     if workspace_id:
         query["workspace_id"] = workspace_id
     
-    boards = await db.boards.find(query, {"_id": 0}).to_list(100)
-    for board in boards:
-        if isinstance(board["created_at"], str):
-            board["created_at"] = datetime.fromisoformat(board["created_at"])
-        if isinstance(board["updated_at"], str):
-            board["updated_at"] = datetime.fromisoformat(board["updated_at"])
+    boards = await paginate(db.boards, query, "board_id", limit, cursor, response, by_created=True)
     return boards
 
 @api_router.get("/boards/{board_id}", response_model=Board)
-async def get_board(board_id: str, user: dict = Depends(get_current_user)):
-    board = await db.boards.find_one({"board_id": board_id, "owner_id": user["user_id"]}, {"_id": 0})
+async def get_board(board_id: str, request: Request, response: Response, user: dict = Depends(get_current_user)):
+    board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 0})
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
-    if isinstance(board["created_at"], str):
-        board["created_at"] = datetime.fromisoformat(board["created_at"])
-    if isinstance(board["updated_at"], str):
-        board["updated_at"] = datetime.fromisoformat(board["updated_at"])
+    etag = board_etag(board)
+    if cached := not_modified(request, etag):
+        return cached
+    set_etag(response, etag)
     return board
 
+@api_router.get("/boards/{board_id}/snapshot", response_model=BoardSnapshot)
+async def get_board_snapshot(board_id: str, request: Request, response: Response, bbox: Optional[str] = None, user: dict = Depends(get_current_user)):
+    viewport = parse_bbox(bbox)
+    board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 0})
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    etag = board_etag(board)
+    if cached := not_modified(request, etag):
+        return cached
+    set_etag(response, etag)
+    # Taken before the reads, so changes racing with them show up in the first delta
+    token = sync_token(datetime.now(timezone.utc))
+    
+    # Oversized boards return their first page here; clients continue via /cards and /links (same bbox)
+    (cards, cards_next_cursor), (links, links_next_cursor) = await asyncio.gather(
+        fetch_page(db.cards, viewport_query(board_id, viewport), "card_id", MAX_PAGE_SIZE),
+        fetch_viewport_links(board_id, viewport)
+    )
+    cards = overlay_viewport(cards, viewport)
+    
+    return {
+        "board": board,
+        "cards": cards,
+        "links": links,
+        "cards_next_cursor": cards_next_cursor,
+        "links_next_cursor": links_next_cursor,
+        "version": etag,
+        "sync_token": token
+    }
+
+@api_router.get("/boards/{board_id}/events")
+async def board_events(board_id: str, request: Request, user: dict = Depends(get_current_user)):
+    """Server-sent stream of card and link changes on a board"""
+    board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 1})
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    
+    queue = event_broker.subscribe(board_id)
+    return StreamingResponse(
+        board_event_stream(request, board_id, queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @api_router.put("/boards/{board_id}")
 async def update_board(board_id: str, data: dict, user: dict = Depends(get_current_user)):
-    board = await db.boards.find_one({"board_id": board_id, "owner_id": user["user_id"]}, {"_id": 0})
+    board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 0})
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
     
-    update_data = {k: v for k, v in data.items() if v is not None and k not in ["board_id", "owner_id", "workspace_id", "created_at"]}
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    # deleted_at is only set by the deletion reaper, which also records the job that removes the children
+    update_data = {k: v for k, v in data.items() if v is not None and k not in [
+        "_id", "board_id", "owner_id", "workspace_id", "created_at", "deleted_at", "version"
+    ]}
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
-    await db.boards.update_one({"board_id": board_id}, {"$set": update_data})
+    updated = await db.boards.find_one_and_update(
+        {"board_id": board_id},
+        {"$set": update_data, "$inc": {"version": 1}},
+        projection={"_id": 0, "version": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if updated:
+        suggest_indexes.bumped(board_id)
+    await publish_board_event(board_id, "board.updated", updated and updated["version"], fields=update_data)
     return {"message": "Board updated"}
 
+@api_router.put("/boards/{board_id}/positions")
+async def update_card_positions(board_id: str, positions: List[CardPosition], user: dict = Depends(get_current_user)):
+    if len(positions) > MAX_POSITION_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_POSITION_BATCH} positions per request")
+    
+    if position_buffer.enabled:
+        # Nothing reaches the buffer unless it is a card on this board
+        board, on_board = await asyncio.gather(
+            db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 1}),
+            db.cards.distinct("card_id", {"board_id": board_id, "card_id": {"$in": [p.card_id for p in positions]}})
+        )
+    else:
+        board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 1})
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    if not positions:
+        return {"matched": 0, "modified": 0}
+    
+    now = datetime.now(timezone.utc)
+    if position_buffer.enabled:
+        on_board = set(on_board)
+        positions = [p for p in positions if p.card_id in on_board]
+        for p in positions:
+            position_buffer.add(p.card_id, board_id, {"position_x": p.x, "position_y": p.y, "updated_at": now})
+        if positions:
+            await publish_board_event(board_id, "cards.moved", positions=[p.model_dump() for p in positions])
+        return {"buffered": len(positions), "updated_at": now}
+    
+    # Scoping each update to board_id keeps cards from other boards untouchable
+    result = await db.cards.bulk_write([
+        UpdateOne(
+            {"card_id": p.card_id, "board_id": board_id},
+            {"$set": {"position_x": p.x, "position_y": p.y, "updated_at": now}, "$inc": {"version": 1}}
+        )
+        for p in positions
+    ], ordered=False)
+    if result.modified_count:
+        version = await bump_board_version(board_id)
+        await publish_board_event(board_id, "cards.moved", version, positions=[p.model_dump() for p in positions])
+    return {"matched": result.matched_count, "modified": result.modified_count, "updated_at": now}
+
 @api_router.delete("/boards/{board_id}")
 async def delete_board(board_id: str, user: dict = Depends(get_current_user)):
-    result = await db.boards.delete_one({"board_id": board_id, "owner_id": user["user_id"]})
-    if result.deleted_count == 0:
+    board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 1})
+    if not board:
         raise HTTPException(status_code=404, detail="Board not found")
-    await db.cards.delete_many({"board_id": board_id})
-    await db.links.delete_many({"board_id": board_id})
-    return {"message": "Board deleted"}
+    # Hidden immediately; cards and links are removed in the background
+    job = await deletion_reaper.enqueue("board", board_id, user["user_id"])
+    suggest_indexes.drop(board_id)
+    await publish_board_event(board_id, "board.deleted")
+    return {"message": "Board deleted", "job_id": job["job_id"]}
 
 # ==================== CARD ROUTES ====================
 
-@api_router.post("/cards", response_model=Card)
-async def create_card(data: CardCreate, user: dict = Depends(get_current_user)):
-    # Verify board ownership
-    board = await db.boards.find_one({"board_id": data.board_id, "owner_id": user["user_id"]}, {"_id": 0})
-    if not board:
-        raise HTTPException(status_code=404, detail="Board not found")
-    
-    card_id = f"card_{uuid.uuid4().hex[:12]}"
-    now = datetime.now(timezone.utc).isoformat()
-    
-    card_doc = {
+def card_document(card_id: str, data: CardCreate, user_id: str, now: datetime) -> dict:
+    return {
         "card_id": card_id,
         "title": data.title,
         "description": data.description or "",
@@ -517,64 +1445,85 @@ async def create_card(data: CardCreate, user: dict = Depends(get_current_user)):
         "due_date": data.due_date,
         "checklist": data.checklist or [],
         "color": data.color,
-        "created_by": user["user_id"],
+        "version": 0,
+        "created_by": user_id,
         "created_at": now,
         "updated_at": now
     }
-    await db.cards.insert_one(card_doc)
+
+@api_router.post("/cards", response_model=Card)
+async def create_card(data: CardCreate, user: dict = Depends(get_current_user)):
+    # Verify board ownership
+    board = await db.boards.find_one(not_deleted({"board_id": data.board_id, "owner_id": user["user_id"]}), {"_id": 1})
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
     
-    result = await db.cards.find_one({"card_id": card_id}, {"_id": 0})
-    result["created_at"] = datetime.fromisoformat(result["created_at"])
-    result["updated_at"] = datetime.fromisoformat(result["updated_at"])
-    return result
+    card_doc = card_document(f"card_{uuid.uuid4().hex[:12]}", data, user["user_id"], datetime.now(timezone.utc))
+    await db.cards.insert_one(card_doc)
+    card_doc.pop("_id", None)
+    version = await bump_board_version(data.board_id)
+    suggest_indexes.upsert_card(card_doc)
+    await publish_board_event(data.board_id, "card.created", version, card=card_doc)
+    return card_doc
 
 @api_router.get("/cards", response_model=List[Card])
-async def get_cards(board_id: str, user: dict = Depends(get_current_user)):
+async def get_cards(board_id: str, request: Request, response: Response, bbox: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, user: dict = Depends(get_current_user)):
+    viewport = parse_bbox(bbox)
     # Verify board ownership
-    board = await db.boards.find_one({"board_id": board_id, "owner_id": user["user_id"]}, {"_id": 0})
+    board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 0})
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
+    etag = board_etag(board)
+    if cached := not_modified(request, etag):
+        return cached
+    set_etag(response, etag)
     
-    cards = await db.cards.find({"board_id": board_id}, {"_id": 0}).to_list(1000)
-    for card in cards:
-        if isinstance(card["created_at"], str):
-            card["created_at"] = datetime.fromisoformat(card["created_at"])
-        if isinstance(card["updated_at"], str):
-            card["updated_at"] = datetime.fromisoformat(card["updated_at"])
-    return cards
+    cards = await paginate(db.cards, viewport_query(board_id, viewport), "card_id", limit, cursor, response)
+    return overlay_viewport(cards, viewport)
 
 @api_router.get("/cards/{card_id}", response_model=Card)
 async def get_card(card_id: str, user: dict = Depends(get_current_user)):
     card = await db.cards.find_one({"card_id": card_id, "created_by": user["user_id"]}, {"_id": 0})
-    if not card:
+    if not card or not await db.boards.find_one(not_deleted({"board_id": card["board_id"]}), {"_id": 1}):
         raise HTTPException(status_code=404, detail="Card not found")
-    if isinstance(card["created_at"], str):
-        card["created_at"] = datetime.fromisoformat(card["created_at"])
-    if isinstance(card["updated_at"], str):
-        card["updated_at"] = datetime.fromisoformat(card["updated_at"])
+    position_buffer.overlay(card)
     return card
 
-@api_router.put("/cards/{card_id}")
+@api_router.put("/cards/{card_id}", response_model=Card)
 async def update_card(card_id: str, data: CardUpdate, user: dict = Depends(get_current_user)):
     card = await db.cards.find_one({"card_id": card_id}, {"_id": 0})
     if not card:
         raise HTTPException(status_code=404, detail="Card not found")
     
     # Verify board ownership
-    board = await db.boards.find_one({"board_id": card["board_id"], "owner_id": user["user_id"]}, {"_id": 0})
+    board = await db.boards.find_one(not_deleted({"board_id": card["board_id"], "owner_id": user["user_id"]}), {"_id": 1})
     if not board:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
-    await db.cards.update_one({"card_id": card_id}, {"$set": update_data})
-    
-    updated = await db.cards.find_one({"card_id": card_id}, {"_id": 0})
-    if isinstance(updated["created_at"], str):
-        updated["created_at"] = datetime.fromisoformat(updated["created_at"])
-    if isinstance(updated["updated_at"], str):
-        updated["updated_at"] = datetime.fromisoformat(updated["updated_at"])
+    if position_buffer.enabled and update_data.keys() - {"updated_at"} <= POSITION_FIELDS:
+        # Position-only drag updates are coalesced and flushed in the background
+        position_buffer.add(card_id, card["board_id"], update_data)
+        updated = position_buffer.overlay(card)
+        await publish_board_event(card["board_id"], "card.updated", card_id=card_id, fields=update_data)
+    else:
+        # A buffered drag that has not been flushed yet goes out with this write instead of being dropped
+        update_data = {**position_buffer.take(card_id, card["board_id"]), **update_data}
+        updated = await db.cards.find_one_and_update(
+            {"card_id": card_id},
+            {"$set": update_data, "$inc": {"version": 1}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if not updated:
+            raise HTTPException(status_code=404, detail="Card not found")
+        version = await bump_board_version(card["board_id"])
+        await publish_board_event(card["board_id"], "card.updated", version, card_id=card_id, fields=update_data)
+        position_buffer.overlay(updated)
+        if update_data.keys() & SUGGEST_FIELDS:
+            suggest_indexes.upsert_card(updated)
     return updated
 
 @api_router.delete("/cards/{card_id}")
@@ -584,74 +1533,99 @@ async def delete_card(card_id: str, user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=404, detail="Card not found")
     
     # Verify board ownership
-    board = await db.boards.find_one({"board_id": card["board_id"], "owner_id": user["user_id"]}, {"_id": 0})
+    board = await db.boards.find_one(not_deleted({"board_id": card["board_id"], "owner_id": user["user_id"]}), {"_id": 0})
     if not board:
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    position_buffer.discard(card_id)
     await db.cards.delete_one({"card_id": card_id})
+    suggest_indexes.remove_card(card["board_id"], card_id)
     # Delete all links involving this card
-    await db.links.delete_many({"$or": [{"source_card_id": card_id}, {"target_card_id": card_id}]})
+    link_query = {
+        "board_id": card["board_id"],
+        "$or": [{"source_card_id": card_id}, {"target_card_id": card_id}]
+    }
+    links = await db.links.find(link_query, {"_id": 0, "link_id": 1}).to_list(None)
+    await db.links.delete_many(link_query)
+    await record_tombstones(card["board_id"], "card", [card_id])
+    await record_tombstones(card["board_id"], "link", [link["link_id"] for link in links])
+    version = await bump_board_version(card["board_id"])
+    # Links touching the card are removed with it
+    await publish_board_event(card["board_id"], "card.deleted", version, card_id=card_id)
     return {"message": "Card deleted"}
 
 # ==================== LINK ROUTES ====================
 
+def link_document(link_id: str, data: LinkCreate, board_id: str, user_id: str, now: datetime) -> dict:
+    return {
+        "link_id": link_id,
+        "source_card_id": data.source_card_id,
+        "target_card_id": data.target_card_id,
+        "link_type": data.link_type,
+        "label": data.label,
+        "color": data.color or "#6B7280",
+        "line_style": data.line_style,
+        "board_id": board_id,
+        "created_by": user_id,
+        "created_at": now
+    }
+
 @api_router.post("/links", response_model=Link)
 async def create_link(data: LinkCreate, user: dict = Depends(get_current_user)):
-    # Verify source card exists and get board_id
-    source_card = await db.cards.find_one({"card_id": data.source_card_id}, {"_id": 0})
+    cards_lookup = db.cards.find(
+        {"card_id": {"$in": [data.source_card_id, data.target_card_id]}},
+        {"_id": 0, "card_id": 1, "board_id": 1}
+    ).to_list(2)
+    if data.board_id:
+        # Both cards in one query, concurrently with the ownership check
+        cards, board = await asyncio.gather(
+            cards_lookup,
+            db.boards.find_one(not_deleted({"board_id": data.board_id, "owner_id": user["user_id"]}), {"_id": 1})
+        )
+    else:
+        cards, board = await cards_lookup, None
+    cards = {card["card_id"]: card for card in cards}
+    
+    source_card = cards.get(data.source_card_id)
     if not source_card:
         raise HTTPException(status_code=404, detail="Source card not found")
-    
-    # Verify target card exists
-    target_card = await db.cards.find_one({"card_id": data.target_card_id}, {"_id": 0})
+    target_card = cards.get(data.target_card_id)
     if not target_card:
         raise HTTPException(status_code=404, detail="Target card not found")
     
-    # Verify board ownership
-    board = await db.boards.find_one({"board_id": source_card["board_id"], "owner_id": user["user_id"]}, {"_id": 0})
+    board_id = data.board_id or source_card["board_id"]
+    if not data.board_id:
+        # Older clients omit board_id, so ownership is checked after the card lookup
+        board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 1})
     if not board:
         raise HTTPException(status_code=403, detail="Not authorized")
+    if source_card["board_id"] != board_id or target_card["board_id"] != board_id:
+        raise HTTPException(status_code=400, detail="Cards must be on the same board")
     
-    # Check if link already exists
-    existing = await db.links.find_one({
-        "source_card_id": data.source_card_id,
-        "target_card_id": data.target_card_id
-    }, {"_id": 0})
-    if existing:
+    link_doc = link_document(f"link_{uuid.uuid4().hex[:12]}", data, board_id, user["user_id"], datetime.now(timezone.utc))
+    try:
+        await db.links.insert_one(link_doc)
+    except DuplicateKeyError:
+        # Enforced by the unique (source_card_id, target_card_id) index, so concurrent creates cannot race
         raise HTTPException(status_code=400, detail="Link already exists")
-    
-    link_id = f"link_{uuid.uuid4().hex[:12]}"
-    now = datetime.now(timezone.utc).isoformat()
-    
-    link_doc = {
-        "link_id": link_id,
-        "source_card_id": data.source_card_id,
-        "target_card_id": data.target_card_id,
-        "link_type": data.link_type,
-        "label": data.label,
-        "color": data.color or "#6B7280",
-        "line_style": data.line_style,
-        "board_id": source_card["board_id"],
-        "created_by": user["user_id"],
-        "created_at": now
-    }
-    await db.links.insert_one(link_doc)
-    
-    result = await db.links.find_one({"link_id": link_id}, {"_id": 0})
-    result["created_at"] = datetime.fromisoformat(result["created_at"])
-    return result
+    link_doc.pop("_id", None)
+    version = await bump_board_version(link_doc["board_id"])
+    await publish_board_event(link_doc["board_id"], "link.created", version, link=link_doc)
+    return link_doc
 
 @api_router.get("/links", response_model=List[Link])
-async def get_links(board_id: str, user: dict = Depends(get_current_user)):
+async def get_links(board_id: str, request: Request, response: Response, bbox: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, user: dict = Depends(get_current_user)):
+    viewport = parse_bbox(bbox)
     # Verify board ownership
-    board = await db.boards.find_one({"board_id": board_id, "owner_id": user["user_id"]}, {"_id": 0})
+    board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 0})
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
+    etag = board_etag(board)
+    if cached := not_modified(request, etag):
+        return cached
+    set_etag(response, etag)
     
-    links = await db.links.find({"board_id": board_id}, {"_id": 0}).to_list(1000)
-    for link in links:
-        if isinstance(link["created_at"], str):
-            link["created_at"] = datetime.fromisoformat(link["created_at"])
+    links = await paginate(db.links, await viewport_link_query(board_id, viewport), "link_id", limit, cursor, response)
     return links
 
 @api_router.delete("/links/{link_id}")
@@ -661,141 +1635,1228 @@ async def delete_link(link_id: str, user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=404, detail="Link not found")
     
     # Verify board ownership
-    board = await db.boards.find_one({"board_id": link["board_id"], "owner_id": user["user_id"]}, {"_id": 0})
+    board = await db.boards.find_one(not_deleted({"board_id": link["board_id"], "owner_id": user["user_id"]}), {"_id": 0})
     if not board:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     await db.links.delete_one({"link_id": link_id})
+    await record_tombstones(link["board_id"], "link", [link_id])
+    version = await bump_board_version(link["board_id"])
+    await publish_board_event(link["board_id"], "link.deleted", version, link_id=link_id)
     return {"message": "Link deleted"}
 
+# ==================== DELTA SYNC ====================
+
+def sync_token(moment: datetime) -> str:
+    # Opaque to clients; milliseconds since the epoch
+    return str(int(moment.timestamp() * 1000))
+
+def parse_sync_token(token: str) -> datetime:
+    try:
+        return datetime.fromtimestamp(int(token) / 1000, tz=timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+async def record_tombstones(board_id: str, kind: str, ids: List[str]):
+    if ids:
+        now = datetime.now(timezone.utc)
+        await db.tombstones.insert_many([{"board_id": board_id, "kind": kind, "id": i, "deleted_at": now} for i in ids])
+
+@api_router.get("/boards/{board_id}/changes", response_model=BoardChanges)
+async def board_changes(board_id: str, since: Optional[str] = None, user: dict = Depends(get_current_user)):
+    """Cards and links written since a sync token, plus tombstones for deletions.
+
+    Replies with reset=true when the client has to reload the board instead: no token,
+    a token older than the tombstone retention, or more than SYNC_MAX_CHANGES changes.
+    Changes inside the overlap window can repeat, so clients apply them as upserts.
+    """
+    board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 0})
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    now = datetime.now(timezone.utc)
+    token = sync_token(now)
+    if since is None:
+        return {"reset": True, "next": token}
+    since_at = parse_sync_token(since)
+    if since_at < now - timedelta(days=SYNC_TOMBSTONE_DAYS):
+        return {"reset": True, "next": token}
+    
+    window = since_at - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+    cards, links, tombstones = await asyncio.gather(
+        db.cards.find({"board_id": board_id, "updated_at": {"$gte": window}}, {"_id": 0}).limit(SYNC_MAX_CHANGES + 1).to_list(SYNC_MAX_CHANGES + 1),
+        db.links.find({"board_id": board_id, "created_at": {"$gte": window}}, {"_id": 0}).limit(SYNC_MAX_CHANGES + 1).to_list(SYNC_MAX_CHANGES + 1),
+        db.tombstones.find({"board_id": board_id, "deleted_at": {"$gte": window}}, {"_id": 0, "kind": 1, "id": 1}).limit(SYNC_MAX_CHANGES + 1).to_list(SYNC_MAX_CHANGES + 1)
+    )
+    if max(len(cards), len(links), len(tombstones)) > SYNC_MAX_CHANGES:
+        return {"reset": True, "next": token}
+    for card in cards:
+        position_buffer.overlay(card)
+    
+    updated_at = board.get("updated_at")
+    return {
+        "reset": False,
+        "next": token,
+        "board": board if isinstance(updated_at, datetime) and updated_at >= window else None,
+        "cards": cards,
+        "links": links,
+        "deleted": {
+            "cards": [t["id"] for t in tombstones if t["kind"] == "card"],
+            "links": [t["id"] for t in tombstones if t["kind"] == "link"]
+        }
+    }
+
+# ==================== OFFLINE PUSH ====================
+
+CLIENT_ID_PATTERN = re.compile(r"^(card|link)_[A-Za-z0-9_-]{1,64}$")
+
+def to_utc(value) -> Optional[datetime]:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime) and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+def version_filter(version: int):
+    # Cards written before the version field existed count as version 0
+    return {"$in": [0, None]} if version == 0 else version
+
+class SyncPushBatch:
+    """Folds an ordered batch of offline card/link operations into one bulk write per collection.
+
+    Conflicts are judged against the stored state at the start of the batch, since every op
+    in it comes from the same client: an op carrying base_version must match the card's
+    version, otherwise its client_ts must not be older than the card's updated_at.
+    """
+
+    def __init__(self, user_id: str, operations: List[SyncOperation]):
+        self.user_id = user_id
+        self.ops = operations
+        now = datetime.now(timezone.utc)
+        # Mongo keeps milliseconds; write() recognises its own updates by this exact value
+        self.now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        self.results = [None] * len(operations)
+        self.boards = set()
+        self.cards = {}  # card_id -> stored document
+        self.links = {}  # link_id -> stored document
+        self.card_writes = {}  # card_id -> {"insert": doc} | {"set": fields, "version": n} | {"delete": version}
+        self.link_writes = {}  # link_id -> {"insert": doc} | {"delete": True}
+        self.op_indexes = {}  # (entity, id) -> indexes of the ops folded into its write
+
+    async def load(self):
+        card_ids, link_ids = set(), set()
+        for op in self.ops:
+            if op.id:
+                (card_ids if op.entity == "card" else link_ids).add(op.id)
+            if op.entity == "link":
+                card_ids.update(v for k, v in op.data.items() if k in ("source_card_id", "target_card_id") and isinstance(v, str))
+        boards, cards, links = await asyncio.gather(
+            db.boards.find(not_deleted({"board_id": {"$in": list({op.board_id for op in self.ops})}, "owner_id": self.user_id}), {"_id": 0, "board_id": 1}).to_list(None),
+            db.cards.find({"card_id": {"$in": list(card_ids)}}, {"_id": 0}).to_list(None),
+            db.links.find({"link_id": {"$in": list(link_ids)}}, {"_id": 0}).to_list(None)
+        )
+        self.boards = {board["board_id"] for board in boards}
+        self.cards = {card["card_id"]: card for card in cards}
+        self.links = {link["link_id"]: link for link in links}
+
+    def result(self, i: int, status: str, **extra):
+        self.results[i] = {"op_id": self.ops[i].op_id, "status": status, **extra}
+
+    def card_view(self, card_id: str) -> Optional[dict]:
+        """The card as the batch has left it so far"""
+        write = self.card_writes.get(card_id)
+        if write and "insert" in write:
+            return write["insert"]
+        if write and "delete" in write:
+            return None
+        return self.cards.get(card_id)
+
+    def conflict(self, i: int, op: SyncOperation, stored: dict) -> bool:
+        if op.base_version is not None:
+            if op.base_version != stored.get("version", 0):
+                self.result(i, "conflict", current=stored)
+                return True
+        elif to_utc(op.client_ts) < to_utc(stored["updated_at"]):
+            self.result(i, "stale", current=stored)
+            return True
+        return False
+
+    def fold(self):
+        for i, op in enumerate(self.ops):
+            if op.board_id not in self.boards:
+                self.result(i, "rejected", detail="Board not found")
+            elif op.entity == "card":
+                self.fold_card(i, op)
+            else:
+                self.fold_link(i, op)
+
+    def fold_card(self, i: int, op: SyncOperation):
+        card_id = op.id or f"card_{uuid.uuid4().hex[:12]}"
+        write = self.card_writes.get(card_id)
+        stored = self.cards.get(card_id)
+        if op.action == "create":
+            if not CLIENT_ID_PATTERN.match(card_id) or not card_id.startswith("card_"):
+                return self.result(i, "rejected", id=card_id, detail="Invalid card id")
+            if stored or (write and "insert" in write):
+                # A retried push: the card is already there
+                same = (stored or write["insert"])["board_id"] == op.board_id
+                return self.result(i, "duplicate" if same else "rejected", id=card_id)
+            try:
+                data = CardCreate(**{**op.data, "board_id": op.board_id})
+            except ValidationError as e:
+                return self.result(i, "rejected", id=card_id, detail=str(e))
+            self.card_writes[card_id] = {"insert": card_document(card_id, data, self.user_id, self.now)}
+        else:
+            view = self.card_view(card_id)
+            if view is None:
+                return self.result(i, "not_found", id=card_id)
+            if view["board_id"] != op.board_id:
+                return self.result(i, "rejected", id=card_id, detail="Card is on another board")
+            if stored and self.conflict(i, op, stored):
+                return
+            if op.action == "update":
+                try:
+                    fields = CardUpdate(**op.data).model_dump(exclude_none=True)
+                except ValidationError as e:
+                    return self.result(i, "rejected", id=card_id, detail=str(e))
+                if write and "insert" in write:
+                    write["insert"].update(fields)
+                else:
+                    self.card_writes.setdefault(card_id, {"set": {}, "version": stored.get("version", 0)})["set"].update(fields)
+            elif write and "insert" in write:
+                # Created and deleted within the same batch: nothing reaches the database
+                del self.card_writes[card_id]
+            else:
+                self.card_writes[card_id] = {"delete": stored.get("version", 0)}
+        self.op_indexes.setdefault(("card", card_id), []).append(i)
+        self.result(i, "applied", id=card_id)
+
+    def fold_link(self, i: int, op: SyncOperation):
+        link_id = op.id or f"link_{uuid.uuid4().hex[:12]}"
+        write = self.link_writes.get(link_id)
+        if op.action == "create":
+            if not CLIENT_ID_PATTERN.match(link_id) or not link_id.startswith("link_"):
+                return self.result(i, "rejected", id=link_id, detail="Invalid link id")
+            if link_id in self.links or (write and "insert" in write):
+                return self.result(i, "duplicate", id=link_id)
+            try:
+                data = LinkCreate(**{**op.data, "board_id": op.board_id})
+            except ValidationError as e:
+                return self.result(i, "rejected", id=link_id, detail=str(e))
+            for card_id in (data.source_card_id, data.target_card_id):
+                card = self.card_view(card_id)
+                if card is None or card["board_id"] != op.board_id:
+                    return self.result(i, "not_found", id=link_id, detail=f"Card {card_id} not found")
+            self.link_writes[link_id] = {"insert": link_document(link_id, data, op.board_id, self.user_id, self.now)}
+        elif op.action == "delete":
+            if write and "insert" in write:
+                del self.link_writes[link_id]
+            elif link_id in self.links and self.links[link_id]["board_id"] == op.board_id and not write:
+                self.link_writes[link_id] = {"delete": True}
+            else:
+                return self.result(i, "not_found", id=link_id)
+        else:
+            return self.result(i, "rejected", id=link_id, detail="Links cannot be updated")
+        self.op_indexes.setdefault(("link", link_id), []).append(i)
+        self.result(i, "applied", id=link_id)
+
+    def lost(self, entity: str, entity_id: str, status: str, detail: str):
+        # A concurrent writer got there between load and write
+        for i in self.op_indexes.get((entity, entity_id), []):
+            self.result(i, status, id=entity_id, detail=detail)
+
+    async def write_cards(self) -> List[str]:
+        requests, ids = [], []
+        for card_id, write in self.card_writes.items():
+            ids.append(card_id)
+            if "insert" in write:
+                requests.append(InsertOne(write["insert"]))
+            elif "set" in write:
+                requests.append(UpdateOne(
+                    {"card_id": card_id, "version": version_filter(write["version"])},
+                    {"$set": {**write["set"], "updated_at": self.now}, "$inc": {"version": 1}}
+                ))
+            else:
+                requests.append(DeleteOne({"card_id": card_id, "version": version_filter(write["delete"])}))
+        if not requests:
+            return []
+        failed = set()
+        try:
+            result = await db.cards.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"] for err in e.details.get("writeErrors", [])}
+            result = None
+        for index in failed:
+            self.lost("card", ids[index], "conflict", "Card was created concurrently")
+        guarded = [card_id for card_id in ids if "insert" not in self.card_writes[card_id]]
+        written = result.matched_count + result.deleted_count if result else None
+        if guarded and (written is None or written < len(guarded)):
+            # Version-guarded writes that matched nothing lost a race; find out which
+            current = {
+                card["card_id"]: card
+                for card in await db.cards.find({"card_id": {"$in": guarded}}, {"_id": 0}).to_list(None)
+            }
+            for card_id in guarded:
+                write, card = self.card_writes[card_id], current.get(card_id)
+                applied = card is None if "delete" in write else (card and card.get("version") == write["version"] + 1 and to_utc(card["updated_at"]) == self.now)
+                if not applied:
+                    self.lost("card", card_id, "conflict", "Card changed concurrently")
+                    if card:
+                        for i in self.op_indexes.get(("card", card_id), []):
+                            self.results[i]["current"] = card
+        return [card_id for card_id in ids if self.results[self.op_indexes[("card", card_id)][-1]]["status"] == "applied"]
+
+    async def write_links(self) -> List[str]:
+        requests, ids = [], []
+        for link_id, write in self.link_writes.items():
+            ids.append(link_id)
+            requests.append(InsertOne(write["insert"]) if "insert" in write else DeleteOne({"link_id": link_id}))
+        if not requests:
+            return []
+        try:
+            await db.links.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                self.lost("link", ids[err["index"]], "duplicate", "Link already exists")
+        return [link_id for link_id in ids if self.results[self.op_indexes[("link", link_id)][-1]]["status"] == "applied"]
+
+    async def apply(self) -> dict:
+        self.fold()
+        cards_written = await self.write_cards()
+        links_written = await self.write_links()
+
+        tombstones = []
+        deleted_cards = [card_id for card_id in cards_written if "delete" in self.card_writes[card_id]]
+        for card_id in deleted_cards:
+            tombstones.append({"board_id": self.cards[card_id]["board_id"], "kind": "card", "id": card_id, "deleted_at": self.now})
+            position_buffer.discard(card_id)
+            suggest_indexes.remove_card(self.cards[card_id]["board_id"], card_id)
+        if deleted_cards:
+            # Links touching deleted cards go with them, including any created in this batch
+            query = {"$or": [{"source_card_id": {"$in": deleted_cards}}, {"target_card_id": {"$in": deleted_cards}}]}
+            orphans = await db.links.find(query, {"_id": 0, "link_id": 1, "board_id": 1}).to_list(None)
+            await db.links.delete_many({"link_id": {"$in": [link["link_id"] for link in orphans]}})
+            tombstones.extend({"board_id": link["board_id"], "kind": "link", "id": link["link_id"], "deleted_at": self.now} for link in orphans)
+        for link_id in links_written:
+            if "delete" in self.link_writes[link_id]:
+                tombstones.append({"board_id": self.links[link_id]["board_id"], "kind": "link", "id": link_id, "deleted_at": self.now})
+        if tombstones:
+            await db.tombstones.insert_many(tombstones)
+
+        touched = set()
+        for card_id in cards_written:
+            write = self.card_writes[card_id]
+            card = write.get("insert") or {**self.cards[card_id], **write.get("set", {})}
+            touched.add(card["board_id"])
+            if "delete" in write:
+                continue
+            if write.get("set", {}).keys() & POSITION_FIELDS:
+                position_buffer.discard(card_id)
+            suggest_indexes.upsert_card(card)
+        for link_id in links_written:
+            touched.add((self.link_writes[link_id].get("insert") or self.links[link_id])["board_id"])
+
+        versions = dict(zip(touched, await asyncio.gather(*(bump_board_version(board_id) for board_id in touched))))
+        for board_id, version in versions.items():
+            await publish_board_event(board_id, "board.synced", version)
+        for write in self.card_writes.values():
+            write.get("insert", {}).pop("_id", None)
+        for write in self.link_writes.values():
+            write.get("insert", {}).pop("_id", None)
+        return {
+            "results": self.results,
+            "applied": sum(1 for r in self.results if r["status"] == "applied"),
+            "board_versions": versions
+        }
+
+@api_router.post("/sync/push")
+async def sync_push(push: SyncPush, user: dict = Depends(get_current_user)):
+    """Apply an offline operation log in one request; results line up with the submitted ops"""
+    if len(push.operations) > SYNC_MAX_OPS:
+        raise HTTPException(status_code=400, detail=f"At most {SYNC_MAX_OPS} operations per push")
+    if not push.operations:
+        return {"results": [], "applied": 0, "board_versions": {}}
+    batch = SyncPushBatch(user["user_id"], push.operations)
+    await batch.load()
+    return await batch.apply()
+
 # ==================== SEARCH ====================
 
-@api_router.get("/search")
-async def search_cards(q: str, board_id: Optional[str] = None, user: dict = Depends(get_current_user)):
+@api_router.get("/search", response_model=List[SearchResult])
+async def search_cards(
+    q: str,
+    response: Response,
+    board_id: Optional[str] = None,
+    mode: str = Query("substring", pattern="^(text|substring)$"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    user: dict = Depends(get_current_user)
+):
     query = {"created_by": user["user_id"]}
     if board_id:
         query["board_id"] = board_id
     
-    # Text search on title and description
-    query["$or"] = [
-        {"title": {"$regex": q, "$options": "i"}},
-        {"description": {"$regex": q, "$options": "i"}},
-        {"tags": {"$regex": q, "$options": "i"}}
-    ]
+    cards = None
+    # A card_id cursor in text mode comes from a page that fell back to substring matching
+    if mode == "text" and (cursor is None or cursor.isdigit()):
+        # Word search served by the cards text index, best matches first; the cursor is an offset
+        offset = int(cursor or 0)
+        try:
+            cards = await db.cards.find(
+                {**query, "$text": {"$search": q}}, {"_id": 0, "score": {"$meta": "textScore"}}
+            ).sort([("score", {"$meta": "textScore"}), ("card_id", 1)]).skip(offset).limit(limit + 1).to_list(limit + 1)
+        except OperationFailure as e:
+            # ensure_indexes only logs a failed cards_text_search build; keep search working without it
+            logger.warning(f"Text search failed, falling back to substring: {e}")
+            cursor = None
+        else:
+            if len(cards) > limit:
+                cards = cards[:limit]
+                response.headers["X-Next-Cursor"] = str(offset + limit)
+    if cards is None:
+        # Literal substring match on title, description and tags
+        pattern = re.escape(q)
+        query["$or"] = [
+            {"title": {"$regex": pattern, "$options": "i"}},
+            {"description": {"$regex": pattern, "$options": "i"}},
+            {"tags": {"$regex": pattern, "$options": "i"}}
+        ]
+        cards = await paginate(db.cards, query, "card_id", limit, cursor, response)
     
-    cards = await db.cards.find(query, {"_id": 0}).to_list(100)
-    for card in cards:
-        if isinstance(card["created_at"], str):
-            card["created_at"] = datetime.fromisoformat(card["created_at"])
-        if isinstance(card["updated_at"], str):
-            card["updated_at"] = datetime.fromisoformat(card["updated_at"])
+    # Cards of soft-deleted boards linger until the reaper reaches them
+    board_ids = list({card["board_id"] for card in cards})
+    if board_ids:
+        live = set(await db.boards.distinct("board_id", not_deleted({"board_id": {"$in": board_ids}})))
+        cards = [card for card in cards if card["board_id"] in live]
     return cards
 
-# ==================== EXPORT/IMPORT ====================
+# ==================== TYPEAHEAD ====================
 
-@api_router.get("/export/{board_id}")
-async def export_board(board_id: str, user: dict = Depends(get_current_user)):
-    board = await db.boards.find_one({"board_id": board_id, "owner_id": user["user_id"]}, {"_id": 0})
+class TrigramIndex:
+    """Trigram and short-prefix index over one board's card titles and tags"""
+
+    def __init__(self):
+        self.grams = {}  # gram -> set of card_ids
+        self.cards = {}  # card_id -> (title, lowercased words, searchable text)
+
+    @staticmethod
+    def words(text: str) -> List[str]:
+        return text.lower().split()
+
+    @staticmethod
+    def grams_for(word: str) -> set:
+        # "^" entries index 1-2 character prefixes so short queries still hit the index
+        grams = {"^" + word[:n] for n in (1, 2) if len(word) >= n}
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+        return grams
+
+    def add(self, card: dict):
+        self.remove(card["card_id"])
+        title = card.get("title") or ""
+        words = self.words(" ".join([title, *(card.get("tags") or [])]))
+        self.cards[card["card_id"]] = (title, title.lower(), words, " ".join(words))
+        for word in words:
+            for gram in self.grams_for(word):
+                self.grams.setdefault(gram, set()).add(card["card_id"])
+
+    def remove(self, card_id: str):
+        entry = self.cards.pop(card_id, None)
+        if entry is None:
+            return
+        for word in entry[2]:
+            for gram in self.grams_for(word):
+                ids = self.grams.get(gram)
+                if ids is not None:
+                    ids.discard(card_id)
+                    if not ids:
+                        del self.grams[gram]
+
+    def _candidates(self, word: str) -> set:
+        if len(word) < 3:
+            return self.grams.get("^" + word, set())
+        sets = sorted((self.grams.get(word[i:i + 3], set()) for i in range(len(word) - 2)), key=len)
+        return set.intersection(*sets)
+
+    def search(self, q: str, limit: int) -> List[dict]:
+        terms = self.words(q)
+        if not terms:
+            return []
+        candidates = None
+        for term in terms:
+            matches = self._candidates(term)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+        # Trigrams only narrow the set; a single short term is already an exact match
+        exact = len(terms) == 1 and len(terms[0]) <= 3
+        prefix = q.strip().lower()
+        first = terms[0]
+
+        def ranked():
+            for card_id in candidates:
+                title, lowered, words, text = self.cards[card_id]
+                if exact or all(term in text for term in terms):
+                    rank = 0 if lowered.startswith(prefix) else 1 if first in words else 2
+                    yield rank, lowered, card_id, title
+
+        return [{"card_id": card_id, "title": title} for _, _, card_id, title in heapq.nsmallest(limit, ranked())]
+
+class SuggestIndexCache:
+    """LRU of per-board trigram indexes, kept current by this worker's card write paths.
+
+    Each index records the board version it reflects. Local writes advance it with their own bumps, so a
+    board version past it means another worker wrote to the board and the index is rebuilt.
+    """
+
+    def __init__(self, max_boards: int):
+        self.max_boards = max_boards
+        self.boards = OrderedDict()  # board_id -> (version, TrigramIndex)
+        self.building = {}  # board_id -> (future, journal of writes that landed during the build)
+        self.builds = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_boards > 0
+
+    async def get(self, board_id: str, version: int) -> TrigramIndex:
+        entry = self.boards.get(board_id)
+        if entry is not None and entry[0] >= version:
+            self.boards.move_to_end(board_id)
+            return entry[1]
+        if board_id in self.building:
+            # Keystrokes arriving mid-build wait for the one build instead of seeing a partial index
+            return await asyncio.shield(self.building[board_id][0])
+        future = asyncio.get_running_loop().create_future()
+        journal = []
+        self.building[board_id] = (future, journal)
+        try:
+            index = TrigramIndex()
+            # Versions are bumped after writes land, so the cursor sees at least everything up to `version`
+            async for card in db.cards.find({"board_id": board_id}, {"_id": 0, "card_id": 1, "title": 1, "tags": 1}):
+                index.add(card)
+            self.builds += 1
+            # The cursor may predate these writes; replaying them in order makes the index current
+            dropped = False
+            for action, payload in journal:
+                if action == "upsert":
+                    index.add(payload)
+                elif action == "remove":
+                    index.remove(payload)
+                elif action == "bump":
+                    version += 1
+                else:
+                    dropped = True
+            if not dropped:
+                self.boards[board_id] = (version, index)
+                self.boards.move_to_end(board_id)
+                while len(self.boards) > self.max_boards:
+                    self.boards.popitem(last=False)
+            future.set_result(index)
+            return index
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; nothing is left unretrieved
+            raise
+        finally:
+            del self.building[board_id]
+
+    def upsert_card(self, card: dict):
+        if card["board_id"] in self.building:
+            self.building[card["board_id"]][1].append(("upsert", card))
+        entry = self.boards.get(card["board_id"])
+        if entry is not None:
+            entry[1].add(card)
+
+    def remove_card(self, board_id: str, card_id: str):
+        if board_id in self.building:
+            self.building[board_id][1].append(("remove", card_id))
+        entry = self.boards.get(board_id)
+        if entry is not None:
+            entry[1].remove(card_id)
+
+    def bumped(self, board_id: str):
+        """Count a version bump made by this worker, whose card writes the index has already applied"""
+        if board_id in self.building:
+            self.building[board_id][1].append(("bump", None))
+        entry = self.boards.get(board_id)
+        if entry is not None:
+            self.boards[board_id] = (entry[0] + 1, entry[1])
+
+    def drop(self, board_id: str):
+        if board_id in self.building:
+            self.building[board_id][1].append(("drop", None))
+        self.boards.pop(board_id, None)
+
+    def stats(self) -> dict:
+        return {"boards": len(self.boards), "builds": self.builds}
+
+suggest_indexes = SuggestIndexCache(SUGGEST_MAX_BOARDS)
+
+@api_router.get("/boards/{board_id}/suggest")
+async def suggest_cards(
+    board_id: str,
+    q: str,
+    limit: int = Query(10, ge=1, le=50),
+    user: dict = Depends(get_current_user)
+):
+    board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 0, "version": 1})
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
     
-    cards = await db.cards.find({"board_id": board_id}, {"_id": 0}).to_list(1000)
-    links = await db.links.find({"board_id": board_id}, {"_id": 0}).to_list(1000)
+    if not suggest_indexes.enabled:
+        cards = await db.cards.find(
+            {"board_id": board_id, "title": {"$regex": "^" + re.escape(q), "$options": "i"}},
+            {"_id": 0, "card_id": 1, "title": 1}
+        ).limit(limit).to_list(limit)
+        return cards
     
+    index = await suggest_indexes.get(board_id, board.get("version", 0))
+    return index.search(q, limit)
+
+# ==================== DEPENDENCY GRAPH ====================
+
+def parse_due_date(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+class DependencyGraph:
+    """One board's blocking relationships as integer adjacency lists.
+
+    An edge u -> v means u has to be finished before v. Every analysis is O(V + E)
+    and memoized; an instance is only ever cached for a single board version.
+    """
+
+    def __init__(self, cards: List[dict], links: List[dict]):
+        self.cards = cards
+        self.index = {card["card_id"]: i for i, card in enumerate(cards)}
+        self.due = [parse_due_date(card.get("due_date")) for card in cards]
+        self.open = [(card.get("status") or "").lower() not in DONE_STATUSES for card in cards]
+        self.succ = succ = [[] for _ in cards]
+        self.pred = pred = [[] for _ in cards]
+        lookup = self.index.get
+        for link in links:
+            direction = DEPENDENCY_LINK_TYPES.get(link.get("link_type"))
+            u = lookup(link["source_card_id"])
+            v = lookup(link["target_card_id"])
+            if direction is None or u is None or v is None:
+                continue
+            if direction < 0:
+                u, v = v, u
+            succ[u].append(v)
+            pred[v].append(u)
+        self.edges = sum(map(len, succ))
+        self._order = None
+        self._cycles = None
+        self._critical = None
+
+    @classmethod
+    def analysed(cls, cards: List[dict], links: List[dict]) -> "DependencyGraph":
+        graph = cls(cards, links)
+        graph.topological_order()
+        graph.cycles()
+        graph.critical_path()
+        return graph
+
+    def summary(self, i: int) -> dict:
+        card = self.cards[i]
+        return {"card_id": card["card_id"], "title": card.get("title", ""), "status": card.get("status"), "due_date": card.get("due_date")}
+
+    def topological_order(self) -> List[int]:
+        """Kahn's algorithm; cards on or behind a cycle are left out"""
+        if self._order is None:
+            indegree = [len(p) for p in self.pred]
+            queue = deque(i for i, d in enumerate(indegree) if d == 0)
+            order = []
+            while queue:
+                u = queue.popleft()
+                order.append(u)
+                for v in self.succ[u]:
+                    indegree[v] -= 1
+                    if indegree[v] == 0:
+                        queue.append(v)
+            self._order = order
+        return self._order
+
+    def cycles(self) -> List[List[int]]:
+        """Strongly connected components that contain a cycle (iterative Tarjan)"""
+        if self._cycles is not None:
+            return self._cycles
+        if len(self.topological_order()) == len(self.cards):
+            self._cycles = []
+            return self._cycles
+        n = len(self.cards)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack = []
+        components = []
+        counter = 0
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, 0)]
+            while work:
+                node, i = work[-1]
+                successors = self.succ[node]
+                if i < len(successors):
+                    work[-1] = (node, i + 1)
+                    nxt = successors[i]
+                    if index[nxt] == -1:
+                        index[nxt] = low[nxt] = counter
+                        counter += 1
+                        stack.append(nxt)
+                        on_stack[nxt] = True
+                        work.append((nxt, 0))
+                    elif on_stack[nxt]:
+                        low[node] = min(low[node], index[nxt])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in successors:
+                        components.append(component)
+        self._cycles = components
+        return components
+
+    def critical_path(self) -> dict:
+        """Longest chain of open cards, plus cards due before something that blocks them"""
+        if self._critical is not None:
+            return self._critical
+        n = len(self.cards)
+        length = [0] * n
+        prev = [-1] * n
+        bound = [None] * n  # latest due date among open transitive blockers
+        bound_by = [-1] * n
+        best = -1
+        for u in self.topological_order():
+            if not self.open[u]:
+                continue
+            for p in self.pred[u]:
+                if not self.open[p]:
+                    continue
+                if length[p] > length[u]:
+                    length[u], prev[u] = length[p], p
+                for date, source in ((self.due[p], p), (bound[p], bound_by[p])):
+                    if date is not None and (bound[u] is None or date > bound[u]):
+                        bound[u], bound_by[u] = date, source
+            length[u] += 1
+            if best == -1 or length[u] > length[best]:
+                best = u
+        path = []
+        while best != -1:
+            path.append(best)
+            best = prev[best]
+        path.reverse()
+        conflicts = [
+            (u, bound_by[u]) for u in range(n)
+            if self.open[u] and self.due[u] is not None and bound[u] is not None and self.due[u] < bound[u]
+        ]
+        self._critical = {"path": path, "conflicts": conflicts}
+        return self._critical
+
+    def blockers(self, card_id: str) -> List[tuple]:
+        """Open cards that transitively block card_id, as (index, depth); finished cards end a chain"""
+        start = self.index[card_id]
+        depth = {start: 0}
+        queue = deque([start])
+        found = []
+        while queue:
+            u = queue.popleft()
+            for p in self.pred[u]:
+                if p in depth or not self.open[p]:
+                    continue
+                depth[p] = depth[u] + 1
+                found.append((p, depth[p]))
+                queue.append(p)
+        return found
+
+class GraphCache:
+    """LRU of per-board dependency graphs keyed by board version"""
+
+    def __init__(self, max_boards: int):
+        self.max_boards = max_boards
+        self.boards = OrderedDict()  # board_id -> (version, DependencyGraph)
+        self.hits = 0
+        self.builds = 0
+
+    async def get(self, board: dict) -> DependencyGraph:
+        board_id, version = board["board_id"], board.get("version", 0)
+        entry = self.boards.get(board_id)
+        if entry is not None and entry[0] == version:
+            self.boards.move_to_end(board_id)
+            self.hits += 1
+            return entry[1]
+        # Versions are bumped after writes land, so data read now is at least as new as `version`
+        cards, links = await asyncio.gather(
+            db.cards.find(
+                {"board_id": board_id}, {"_id": 0, "card_id": 1, "title": 1, "status": 1, "due_date": 1}
+            ).sort("card_id", 1).to_list(None),
+            db.links.find(
+                {"board_id": board_id, "link_type": {"$in": list(DEPENDENCY_LINK_TYPES)}},
+                {"_id": 0, "source_card_id": 1, "target_card_id": 1, "link_type": 1}
+            ).to_list(None)
+        )
+        # Built and analysed off the event loop; requests for this version are then lookups
+        graph = await asyncio.get_running_loop().run_in_executor(None, DependencyGraph.analysed, cards, links)
+        self.builds += 1
+        if self.max_boards > 0:
+            self.boards[board_id] = (version, graph)
+            self.boards.move_to_end(board_id)
+            while len(self.boards) > self.max_boards:
+                self.boards.popitem(last=False)
+        return graph
+
+    def stats(self) -> dict:
+        return {"boards": len(self.boards), "hits": self.hits, "builds": self.builds}
+
+graph_cache = GraphCache(GRAPH_CACHE_BOARDS)
+
+async def graph_board(board_id: str, user: dict) -> dict:
+    board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 0, "board_id": 1, "version": 1})
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    return board
+
+@api_router.get("/boards/{board_id}/graph/topological-order")
+async def graph_topological_order(board_id: str, request: Request, response: Response, user: dict = Depends(get_current_user)):
+    board = await graph_board(board_id, user)
+    etag = board_etag(board)
+    if cached := not_modified(request, etag):
+        return cached
+    set_etag(response, etag)
+    
+    graph = await graph_cache.get(board)
+    order = graph.topological_order()
+    ordered = set(order)
     return {
-        "board": board,
-        "cards": cards,
-        "links": links,
-        "exported_at": datetime.now(timezone.utc).isoformat()
+        "order": [graph.cards[i]["card_id"] for i in order],
+        "cyclic": len(order) < len(graph.cards),
+        # On a cycle, or downstream of one
+        "unordered": [card["card_id"] for i, card in enumerate(graph.cards) if i not in ordered]
+    }
+
+@api_router.get("/boards/{board_id}/graph/cycles")
+async def graph_cycles(board_id: str, request: Request, response: Response, user: dict = Depends(get_current_user)):
+    board = await graph_board(board_id, user)
+    etag = board_etag(board)
+    if cached := not_modified(request, etag):
+        return cached
+    set_etag(response, etag)
+    
+    graph = await graph_cache.get(board)
+    return {"cycles": [[graph.summary(i) for i in component] for component in graph.cycles()]}
+
+@api_router.get("/boards/{board_id}/graph/critical-path")
+async def graph_critical_path(board_id: str, request: Request, response: Response, user: dict = Depends(get_current_user)):
+    board = await graph_board(board_id, user)
+    etag = board_etag(board)
+    if cached := not_modified(request, etag):
+        return cached
+    set_etag(response, etag)
+    
+    graph = await graph_cache.get(board)
+    result = graph.critical_path()
+    return {
+        "path": [graph.summary(i) for i in result["path"]],
+        "length": len(result["path"]),
+        "due_date_conflicts": [
+            {"card": graph.summary(card), "blocked_by": graph.summary(blocker)}
+            for card, blocker in result["conflicts"]
+        ],
+        "cyclic": len(graph.topological_order()) < len(graph.cards)
+    }
+
+@api_router.get("/boards/{board_id}/graph/blockers/{card_id}")
+async def graph_blockers(board_id: str, card_id: str, request: Request, response: Response, user: dict = Depends(get_current_user)):
+    board = await graph_board(board_id, user)
+    etag = board_etag(board)
+    if cached := not_modified(request, etag):
+        return cached
+    set_etag(response, etag)
+    
+    graph = await graph_cache.get(board)
+    if card_id not in graph.index:
+        raise HTTPException(status_code=404, detail="Card not found")
+    return {
+        "card_id": card_id,
+        "blockers": [{**graph.summary(i), "depth": depth} for i, depth in graph.blockers(card_id)]
+    }
+
+# ==================== EXPORT/IMPORT ====================
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(doc: Any) -> str:
+    return json.dumps(doc, default=json_default, separators=(",", ":"))
+
+async def export_docs(kind: str, board_id: str):
+    if kind == "cards":
+        cursor = db.cards.find({"board_id": board_id}, {"_id": 0}).sort("card_id", 1)
+    else:
+        cursor = db.links.find({"board_id": board_id}, {"_id": 0}).sort("link_id", 1)
+    async for doc in cursor.batch_size(EXPORT_BATCH_SIZE):
+        yield position_buffer.overlay(doc) if kind == "cards" else doc
+
+async def export_json(board: dict):
+    yield '{"board":' + dumps(board)
+    for kind in ("cards", "links"):
+        yield f',"{kind}":['
+        separator = ""
+        async for doc in export_docs(kind, board["board_id"]):
+            yield separator + dumps(doc)
+            separator = ","
+        yield "]"
+    yield ',"exported_at":' + dumps(datetime.now(timezone.utc)) + "}"
+
+async def export_ndjson(board: dict):
+    yield dumps({"type": "board", "data": board}) + "\n"
+    for kind, record_type in (("cards", "card"), ("links", "link")):
+        async for doc in export_docs(kind, board["board_id"]):
+            yield dumps({"type": record_type, "data": doc}) + "\n"
+    yield dumps({"type": "end", "exported_at": datetime.now(timezone.utc)}) + "\n"
+
+async def chunked(parts, compress: bool = False):
+    """Group small string parts into byte chunks, optionally gzip encoded"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = []
+    size = 0
+    first = True
+    async for part in parts:
+        buffer.append(part)
+        size += len(part)
+        # The first chunk goes out immediately so clients see bytes without waiting on the cursors
+        if first or size >= EXPORT_CHUNK_BYTES:
+            data = "".join(buffer).encode("utf-8")
+            if compressor:
+                data = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield data
+            buffer, size, first = [], 0, False
+    data = "".join(buffer).encode("utf-8")
+    yield compressor.compress(data) + compressor.flush() if compressor else data
+
+@api_router.get("/export/{board_id}")
+async def export_board(
+    board_id: str,
+    request: Request,
+    export_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    gzip: bool = False,
+    user: dict = Depends(get_current_user)
+):
+    board = await db.boards.find_one(not_deleted({"board_id": board_id, "owner_id": user["user_id"]}), {"_id": 0})
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    etag = board_etag(board)
+    if cached := not_modified(request, etag):
+        return cached
+    
+    parts = export_ndjson(board) if export_format == "ndjson" else export_json(board)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{board_id}.{export_format}"',
+        "ETag": etag,
+        "Cache-Control": "private, no-cache"
     }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        chunked(parts, compress=gzip),
+        media_type="application/x-ndjson" if export_format == "ndjson" else "application/json",
+        headers=headers
+    )
+
+class BoardImporter:
+    """Validates import records one at a time and writes them in unordered batches"""
+
+    def __init__(self, user_id: str, workspace_id: str):
+        self.user_id = user_id
+        self.workspace_id = workspace_id
+        self.board_id = f"board_{uuid.uuid4().hex[:12]}"
+        self.now = datetime.now(timezone.utc)
+        self.board_created = False
+        self.card_id_map = {}
+        self.pending_cards = []  # (old card_id, doc)
+        self.pending_links = []
+        self.cards_imported = 0
+        self.links_imported = 0
+        self.links_skipped = 0
+        self.error_count = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    def error(self, line: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    async def add_board(self, board: Any, line: int = 0):
+        if self.board_created:
+            self.error(line, "Board record must precede cards and links")
+            return
+        try:
+            data = ImportBoard.model_validate(board)
+        except Exception as e:
+            # The board is still created with defaults when the first card or the end of the import arrives
+            self.error(line, f"Invalid board: {e}")
+            return
+        self.board_created = True
+        await db.boards.insert_one({
+            "board_id": self.board_id,
+            "name": data.name,
+            "description": data.description,
+            "workspace_id": self.workspace_id,
+            "owner_id": self.user_id,
+            "statuses": DEFAULT_STATUSES if data.statuses is None else data.statuses,
+            "version": 0,
+            "created_at": self.now,
+            "updated_at": self.now
+        })
+
+    async def add_card(self, card: Any, line: int = 0):
+        try:
+            data = ImportCard.model_validate(card)
+        except Exception as e:
+            self.error(line, f"Invalid card: {e}")
+            return
+        if not self.board_created:
+            await self.add_board({})
+        new_card_id = f"card_{uuid.uuid4().hex[:12]}"
+        if data.card_id:
+            self.card_id_map[data.card_id] = new_card_id
+        self.pending_cards.append((data.card_id, {
+            "card_id": new_card_id,
+            "title": data.title,
+            "description": data.description,
+            "card_type": data.card_type,
+            "status": data.status,
+            "board_id": self.board_id,
+            "position_x": data.position_x,
+            "position_y": data.position_y,
+            "priority": data.priority,
+            "assignees": data.assignees,
+            "tags": data.tags,
+            "due_date": data.due_date,
+            "checklist": data.checklist,
+            "color": data.color,
+            "created_by": self.user_id,
+            "version": 0,
+            "created_at": self.now,
+            "updated_at": self.now
+        }))
+        if len(self.pending_cards) >= IMPORT_BATCH_SIZE:
+            await self.flush_cards()
+
+    async def add_link(self, link: Any, line: int = 0):
+        try:
+            data = ImportLink.model_validate(link)
+        except Exception as e:
+            self.error(line, f"Invalid link: {e}")
+            return
+        # Links can only reference cards that appeared earlier in the upload
+        if data.source_card_id not in self.card_id_map or data.target_card_id not in self.card_id_map:
+            self.links_skipped += 1
+            return
+        if not self.board_created:
+            await self.add_board({})
+        self.pending_links.append({
+            "link_id": f"link_{uuid.uuid4().hex[:12]}",
+            "source_card_id": self.card_id_map[data.source_card_id],
+            "target_card_id": self.card_id_map[data.target_card_id],
+            "link_type": data.link_type,
+            "label": data.label,
+            "color": data.color,
+            "line_style": data.line_style,
+            "board_id": self.board_id,
+            "created_by": self.user_id,
+            "created_at": self.now
+        })
+        if len(self.pending_links) >= IMPORT_BATCH_SIZE:
+            await self.flush_links()
+
+    async def flush_cards(self):
+        if not self.pending_cards:
+            return
+        batch, self.pending_cards = self.pending_cards, []
+        failed = await self._insert(db.cards, [doc for _, doc in batch])
+        for index in failed:
+            # Links must not point at cards that never made it in
+            self.card_id_map.pop(batch[index][0], None)
+        failed = set(failed)
+        for index, (_, doc) in enumerate(batch):
+            if index not in failed:
+                suggest_indexes.upsert_card(doc)
+        self.cards_imported += len(batch) - len(failed)
+
+    async def flush_links(self):
+        # Cards go first so every mapped id exists before a link references it
+        await self.flush_cards()
+        if not self.pending_links:
+            return
+        batch, self.pending_links = self.pending_links, []
+        failed = await self._insert(db.links, batch)
+        self.links_imported += len(batch) - len(failed)
+
+    async def _insert(self, collection, docs: List[dict]) -> List[int]:
+        try:
+            await collection.insert_many(docs, ordered=False)
+            return []
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            for err in write_errors:
+                self.error(0, f"{collection.name} insert failed: {err.get('errmsg')}")
+            return [err["index"] for err in write_errors]
+
+    async def finish(self) -> dict:
+        if not self.board_created:
+            await self.add_board({})
+        await self.flush_links()
+        elapsed = time.perf_counter() - self.started
+        records = self.cards_imported + self.links_imported
+        return {
+            "board_id": self.board_id,
+            "message": "Board imported successfully" if not self.error_count else "Board imported with errors",
+            "cards_imported": self.cards_imported,
+            "links_imported": self.links_imported,
+            "links_skipped": self.links_skipped,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "records_per_second": round(records / elapsed) if elapsed > 0 else records
+        }
+
+async def request_lines(request: Request):
+    """Yield complete lines from a (optionally gzip encoded) request body as it arrives"""
+    decompressor = zlib.decompressobj(47) if request.headers.get("content-encoding") == "gzip" else None
+    remainder = b""
+    async for chunk in request.stream():
+        if decompressor:
+            chunk = decompressor.decompress(chunk)
+        remainder += chunk
+        *lines, remainder = remainder.split(b"\n")
+        for line in lines:
+            yield line
+    if decompressor:
+        remainder += decompressor.flush()
+        if not decompressor.eof:
+            raise zlib.error("incomplete or truncated stream")
+    if remainder:
+        yield remainder
 
 @api_router.post("/import")
-async def import_board(data: dict, user: dict = Depends(get_current_user)):
-    board_data = data.get("board", {})
-    cards_data = data.get("cards", [])
-    links_data = data.get("links", [])
-    workspace_id = data.get("workspace_id")
+async def import_board(request: Request, workspace_id: Optional[str] = None, user: dict = Depends(get_current_user)):
+    """Import a board from a JSON export document or a streamed NDJSON export"""
+    streaming = "ndjson" in request.headers.get("content-type", "")
+    if not streaming:
+        body = await request.body()
+        if request.headers.get("content-encoding") == "gzip":
+            try:
+                body = zlib.decompress(body, 47)
+            except zlib.error:
+                raise HTTPException(status_code=400, detail="Invalid gzip body")
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON")
+        if not isinstance(data, dict):
+            raise HTTPException(status_code=400, detail="Expected a JSON object")
+        workspace_id = data.get("workspace_id") or workspace_id
     
     if not workspace_id:
         raise HTTPException(status_code=400, detail="workspace_id required")
     
     # Verify workspace ownership
-    ws = await db.workspaces.find_one({"workspace_id": workspace_id, "owner_id": user["user_id"]}, {"_id": 0})
+    ws = await db.workspaces.find_one(not_deleted({"workspace_id": workspace_id, "owner_id": user["user_id"]}), {"_id": 0})
     if not ws:
         raise HTTPException(status_code=404, detail="Workspace not found")
     
-    # Create new board
-    new_board_id = f"board_{uuid.uuid4().hex[:12]}"
-    now = datetime.now(timezone.utc).isoformat()
+    importer = BoardImporter(user["user_id"], workspace_id)
     
-    new_board = {
-        "board_id": new_board_id,
-        "name": board_data.get("name", "Imported Board"),
-        "description": board_data.get("description", ""),
-        "workspace_id": workspace_id,
-        "owner_id": user["user_id"],
-        "statuses": board_data.get("statuses", DEFAULT_STATUSES),
-        "created_at": now,
-        "updated_at": now
-    }
-    await db.boards.insert_one(new_board)
+    if not streaming:
+        await importer.add_board(data.get("board") or {})
+        for index, card in enumerate(data.get("cards") or []):
+            await importer.add_card(card, index)
+        for index, link in enumerate(data.get("links") or []):
+            await importer.add_link(link, index)
+        return await importer.finish()
     
-    # Map old card IDs to new ones
-    card_id_map = {}
-    
-    for card in cards_data:
-        old_id = card.get("card_id")
-        new_card_id = f"card_{uuid.uuid4().hex[:12]}"
-        card_id_map[old_id] = new_card_id
-        
-        new_card = {
-            "card_id": new_card_id,
-            "title": card.get("title", ""),
-            "description": card.get("description", ""),
-            "card_type": card.get("card_type", "task"),
-            "status": card.get("status", "idea"),
-            "board_id": new_board_id,
-            "position_x": card.get("position_x", 0),
-            "position_y": card.get("position_y", 0),
-            "priority": card.get("priority", "medium"),
-            "assignees": card.get("assignees", []),
-            "tags": card.get("tags", []),
-            "due_date": card.get("due_date"),
-            "checklist": card.get("checklist", []),
-            "color": card.get("color"),
-            "created_by": user["user_id"],
-            "created_at": now,
-            "updated_at": now
-        }
-        await db.cards.insert_one(new_card)
-    
-    # Create links with new IDs
-    for link in links_data:
-        old_source = link.get("source_card_id")
-        old_target = link.get("target_card_id")
-        
-        if old_source in card_id_map and old_target in card_id_map:
-            new_link = {
-                "link_id": f"link_{uuid.uuid4().hex[:12]}",
-                "source_card_id": card_id_map[old_source],
-                "target_card_id": card_id_map[old_target],
-                "link_type": link.get("link_type", "related_to"),
-                "label": link.get("label"),
-                "color": link.get("color", "#6B7280"),
-                "line_style": link.get("line_style", "solid"),
-                "board_id": new_board_id,
-                "created_by": user["user_id"],
-                "created_at": now
-            }
-            await db.links.insert_one(new_link)
-    
-    return {"board_id": new_board_id, "message": "Board imported successfully"}
+    line_number = 0
+    try:
+        async for line in request_lines(request):
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                record_type = record.get("type")
+                record_data = record.get("data") or {}
+            except (ValueError, AttributeError):
+                importer.error(line_number, "Invalid JSON record")
+                continue
+            if record_type == "card":
+                await importer.add_card(record_data, line_number)
+            elif record_type == "link":
+                await importer.add_link(record_data, line_number)
+            elif record_type == "board":
+                await importer.add_board(record_data, line_number)
+            elif record_type != "end":
+                importer.error(line_number, f"Unknown record type: {record_type}")
+    except zlib.error as e:
+        # Records before the corruption are already in; the rest of the body is unreadable
+        importer.error(line_number + 1, f"Invalid gzip body: {e}")
+    return await importer.finish()
 
 # ==================== HEALTH CHECK ====================
 
 @api_router.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now(timezone.utc).isoformat()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "user_cache": user_cache.stats(),
+        "bcrypt_pending": bcrypt_pending,
+        "position_buffer": position_buffer.stats(),
+        "deletion_reaper": deletion_reaper.stats(),
+        "graph_cache": graph_cache.stats(),
+        "suggest_indexes": suggest_indexes.stats(),
+        "auth_provider": auth_provider.stats()
+    }
+
+# ==================== METRICS ====================
+
+REGISTRY.register(StatsCollector({
+    "bcrypt": lambda: {"pending": bcrypt_pending},
+    "user_cache": lambda: user_cache.stats(),
+    "position_buffer": lambda: position_buffer.stats(),
+    "deletion_reaper": lambda: deletion_reaper.stats(),
+    "graph_cache": lambda: graph_cache.stats(),
+    "suggest_indexes": lambda: suggest_indexes.stats(),
+    "auth_provider": lambda: auth_provider.stats()
+}))
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
 
 # Include router
 app.include_router(api_router)
@@ -806,8 +2867,42 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware, sample_rate=REQUEST_TRACE_SAMPLE_RATE, slow_ms=SLOW_REQUEST_MS)
+
+@app.on_event("startup")
+async def create_indexes():
+    await ensure_indexes()
+    missing = await audit_indexes()
+    if missing:
+        message = f"Required indexes missing: {', '.join(missing)}"
+        if INDEX_AUDIT_STRICT:
+            raise RuntimeError(message)
+        logger.warning(message)
+
+@app.on_event("startup")
+async def migrate_sessions():
+    await backfill_session_expiry()
+
+@app.on_event("startup")
+async def start_position_buffer():
+    position_buffer.start()
+
+@app.on_event("startup")
+async def start_deletion_reaper():
+    deletion_reaper.start()
+
+@app.on_event("startup")
+async def start_auth_provider():
+    auth_provider.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Flush buffered positions before the connection goes away
+    await position_buffer.stop()
+    await deletion_reaper.stop()
+    await auth_provider.stop()
     client.close()
+    bcrypt_executor.shutdown(wait=False)
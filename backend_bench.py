@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+CardFlow Backend Benchmarks
+Latency measurements against a running backend (run once before and once after a change)
+
+Usage: python backend_bench.py [base_url] [logins|loop|search|serialization|graph|all]
+"""
+
+import asyncio
+import requests
+import sys
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def import_server():
+    """The backend module itself, for benchmarks that run in-process"""
+    import os
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "cardflow_bench")
+    import server
+    return server
+
+class CardFlowBenchmark:
+    def __init__(self, base_url: str = "http://localhost:8001"):
+        self.base_url = base_url.rstrip('/')
+        self.token = None
+        self.email = None
+        self.password = "BenchPassword123!"
+        self.workspace_id = None
+        self.board_id = None
+
+    def request(self, method: str, endpoint: str, data: Optional[Dict] = None, token: Optional[str] = None):
+        url = f"{self.base_url}/api/{endpoint.lstrip('/')}"
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        return requests.request(method, url, json=data, headers=headers, timeout=60)
+
+    def setup(self, cards: int = 50):
+        """Register a user and create a board with some cards"""
+        timestamp = int(datetime.now().timestamp())
+        self.email = f"bench.{time.time_ns()}@cardflow.test"
+        response = self.request('POST', '/auth/register', {
+            "email": self.email,
+            "password": self.password,
+            "name": f"Bench User {timestamp}"
+        })
+        response.raise_for_status()
+        self.token = response.json()['token']
+
+        response = self.request('POST', '/workspaces', {"name": "Bench Workspace"}, token=self.token)
+        response.raise_for_status()
+        self.workspace_id = response.json()['workspace_id']
+
+        response = self.request('POST', '/boards', {"name": "Bench Board", "workspace_id": self.workspace_id}, token=self.token)
+        response.raise_for_status()
+        self.board_id = response.json()['board_id']
+
+        for i in range(cards):
+            self.request('POST', '/cards', {
+                "title": f"Bench Card {i}",
+                "board_id": self.board_id,
+                "position_x": i * 10.0,
+                "position_y": i * 10.0
+            }, token=self.token).raise_for_status()
+
+    def bench_cards_under_logins(self, duration: float = 10.0, login_threads: int = 8, reader_threads: int = 4):
+        """p50/p99 latency of GET /api/cards while other clients hammer /api/auth/login"""
+        stop = threading.Event()
+        latencies = []
+        lock = threading.Lock()
+        logins = [0]
+
+        def login_loop():
+            while not stop.is_set():
+                self.request('POST', '/auth/login', {"email": self.email, "password": self.password})
+                with lock:
+                    logins[0] += 1
+
+        def read_loop():
+            while not stop.is_set():
+                start = time.perf_counter()
+                response = self.request('GET', f'/cards?board_id={self.board_id}', token=self.token)
+                elapsed = (time.perf_counter() - start) * 1000
+                if response.status_code == 200:
+                    with lock:
+                        latencies.append(elapsed)
+
+        with ThreadPoolExecutor(max_workers=login_threads + reader_threads) as pool:
+            for _ in range(login_threads):
+                pool.submit(login_loop)
+            for _ in range(reader_threads):
+                pool.submit(read_loop)
+            time.sleep(duration)
+            stop.set()
+
+        print(f"GET /api/cards with {login_threads} concurrent login clients for {duration:.0f}s")
+        print(f"  requests: {len(latencies)}  logins: {logins[0]}")
+        print(f"  p50: {percentile(latencies, 50):.1f} ms  p99: {percentile(latencies, 99):.1f} ms  max: {max(latencies, default=0):.1f} ms")
+
+    def seed_cards(self, count: int, batch: int = 50000):
+        """Create a fresh user and import `count` cards through the streaming NDJSON import"""
+        self.setup(cards=0)
+        words = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet",
+                 "kilo", "lima", "mike", "november", "oscar", "papa", "quebec", "romeo", "sierra", "tango"]
+        rng = random.Random(count)
+
+        def records(start: int, stop: int):
+            yield json.dumps({"type": "board", "data": {"name": f"Search Bench {start}"}}) + "\n"
+            for i in range(start, stop):
+                yield json.dumps({"type": "card", "data": {
+                    "card_id": f"c{i}",
+                    "title": " ".join(rng.choice(words) for _ in range(3)) + f" {i}",
+                    "description": " ".join(rng.choice(words) for _ in range(12)),
+                    "tags": [rng.choice(words)]
+                }}) + "\n"
+
+        for start in range(0, count, batch):
+            response = requests.post(
+                f"{self.base_url}/api/import?workspace_id={self.workspace_id}",
+                data=(line.encode("utf-8") for line in records(start, min(count, start + batch))),
+                headers={"Content-Type": "application/x-ndjson", "Authorization": f"Bearer {self.token}"},
+                timeout=600
+            )
+            response.raise_for_status()
+            report = response.json()
+            print(f"  imported {report['cards_imported']} cards at {report['records_per_second']} records/s")
+
+    def bench_search(self, sizes: List[int] = (10000, 100000, 1000000), queries: int = 50):
+        """Search latency per mode as the number of cards a user owns grows"""
+        for size in sizes:
+            print(f"Seeding {size} cards")
+            self.seed_cards(size)
+            for mode in ("text", "substring"):
+                latencies = []
+                for i in range(queries):
+                    term = ["delta", "oscar", "sierra", "kilo", "mike"][i % 5]
+                    start = time.perf_counter()
+                    self.request('GET', f'/search?q={term}&mode={mode}&limit=50', token=self.token).raise_for_status()
+                    latencies.append((time.perf_counter() - start) * 1000)
+                print(f"  {size:>8} cards  {mode:<9}  p50: {percentile(latencies, 50):.1f} ms  p99: {percentile(latencies, 99):.1f} ms")
+
+    def bench_serialization(self, cards: int = 1000, rounds: int = 200):
+        """CPU per 1,000-card response: ISO strings parsed per row vs native datetimes (no server needed)"""
+        import os
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+        os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+        os.environ.setdefault("DB_NAME", "cardflow_bench")
+        from pydantic import TypeAdapter
+        from server import Card
+
+        adapter = TypeAdapter(List[Card])
+        now = datetime.now().astimezone()
+        native = [{
+            "card_id": f"card_{i:012d}", "title": f"Card {i}", "card_type": "task", "status": "idea",
+            "board_id": "board_bench", "position_x": i, "position_y": i, "created_by": "user_bench",
+            "created_at": now, "updated_at": now
+        } for i in range(cards)]
+        strings = [{**card, "created_at": now.isoformat(), "updated_at": now.isoformat()} for card in native]
+
+        def legacy():
+            rows = [dict(card) for card in strings]
+            for row in rows:
+                if isinstance(row["created_at"], str):
+                    row["created_at"] = datetime.fromisoformat(row["created_at"])
+                if isinstance(row["updated_at"], str):
+                    row["updated_at"] = datetime.fromisoformat(row["updated_at"])
+            return adapter.dump_json(adapter.validate_python(rows))
+
+        def current():
+            rows = [dict(card) for card in native]
+            return adapter.dump_json(adapter.validate_python(rows))
+
+        for name, fn in (("ISO strings + fromisoformat", legacy), ("native datetimes", current)):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                fn()
+            per_response = (time.perf_counter() - start) / rounds * 1000
+            print(f"  {name:<28} {per_response:.2f} ms CPU per {cards}-card response")
+
+    def bench_loop_under_logins(self, duration: float = 10.0, login_tasks: int = 8, reader_tasks: int = 4, io_ms: float = 2.0):
+        """Read latency on one event loop while logins verify passwords, bcrypt inline vs on the pool (no server needed)
+
+        Each read awaits io_ms in place of the Mongo round trip behind GET /api/cards, so what is measured
+        is how long the loop takes to get back to it.
+        """
+        server = import_server()
+        hashed = server._hash_password(self.password)
+
+        async def measure(on_pool: bool) -> tuple:
+            latencies = []
+            logins = [0]
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + duration
+
+            async def login_loop():
+                while loop.time() < deadline:
+                    await asyncio.sleep(io_ms / 1000)  # the user lookup that precedes the check
+                    if on_pool:
+                        await server.verify_password(self.password, hashed)
+                    else:
+                        server._verify_password(self.password, hashed)
+                    logins[0] += 1
+
+            async def read_loop():
+                while loop.time() < deadline:
+                    start = time.perf_counter()
+                    await asyncio.sleep(io_ms / 1000)
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+            await asyncio.gather(*(login_loop() for _ in range(login_tasks)), *(read_loop() for _ in range(reader_tasks)))
+            return latencies, logins[0]
+
+        print(f"Reads on the event loop with {login_tasks} concurrent logins for {duration:.0f}s "
+              f"(bcrypt rounds {server.BCRYPT_ROUNDS}, {server.BCRYPT_WORKERS} pool workers)")
+        for name, on_pool in (("bcrypt on the loop (before)", False), ("bcrypt on the pool (after)", True)):
+            latencies, logins = asyncio.run(measure(on_pool))
+            print(f"  {name:<28} reads: {len(latencies):>5}  logins: {logins:>3}  p50: {percentile(latencies, 50):.1f} ms"
+                  f"  p99: {percentile(latencies, 99):.1f} ms  max: {max(latencies, default=0):.1f} ms")
+
+    def bench_graph(self, cards: int = 10000, links: int = 50000, rounds: int = 5):
+        """Dependency graph build and per-query cost on a random DAG (no server needed)"""
+        DependencyGraph = import_server().DependencyGraph
+
+        rng = random.Random(cards)
+        card_docs = [{
+            "card_id": f"card_{i:06d}", "title": f"Card {i}", "status": rng.choice(["idea", "planned", "done"]),
+            "due_date": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if rng.random() < 0.3 else None
+        } for i in range(cards)]
+        link_docs = []
+        for _ in range(links):
+            a, b = sorted(rng.sample(range(cards), 2))
+            link_type = rng.choice(["blocks", "depends_on"])
+            if link_type == "depends_on":
+                a, b = b, a
+            link_docs.append({"source_card_id": f"card_{a:06d}", "target_card_id": f"card_{b:06d}", "link_type": link_type})
+
+        timings = {"build": [], "topological order": [], "cycles": [], "critical path": [], "blockers (one card)": []}
+        for _ in range(rounds):
+            start = time.perf_counter()
+            graph = DependencyGraph(card_docs, link_docs)
+            timings["build"].append(time.perf_counter() - start)
+            for name, fn in (("topological order", graph.topological_order), ("cycles", graph.cycles),
+                             ("critical path", graph.critical_path),
+                             ("blockers (one card)", lambda: graph.blockers(f"card_{cards // 2:06d}"))):
+                start = time.perf_counter()
+                fn()
+                timings[name].append(time.perf_counter() - start)
+        print(f"Dependency graph, {cards} cards / {links} links (analyses are memoized per board version)")
+        for name, samples in timings.items():
+            print(f"  {name:<20} p50: {percentile(samples, 50) * 1000:.1f} ms")
+
+def main():
+    """Main benchmark execution"""
+    base_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8001"
+    which = sys.argv[2] if len(sys.argv) > 2 else "logins"
+    bench = CardFlowBenchmark(base_url)
+
+    try:
+        print(f"📍 Benchmarking against: {bench.base_url}")
+        if which in ("logins", "all"):
+            bench.setup()
+            bench.bench_cards_under_logins()
+        if which in ("loop", "all"):
+            bench.bench_loop_under_logins()
+        if which in ("search", "all"):
+            bench.bench_search()
+        if which in ("serialization", "all"):
+            bench.bench_serialization()
+        if which in ("graph", "all"):
+            bench.bench_graph()
+        return 0
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Benchmark interrupted by user")
+        return 1
+    except Exception as e:
+        print(f"\n\n💥 Unexpected error: {str(e)}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -225,6 +225,23 @@ class CardFlowAPITester:
         )
         return success and is_list
 
+    def test_get_board_snapshot(self):
+        """Test single-request board snapshot"""
+        if not self.board_id:
+            self.log_result("Get Board Snapshot", False, "No board_id available", {})
+            return False
+        
+        success, response = self.make_request('GET', f'/boards/{self.board_id}/snapshot')
+        
+        has_required_keys = all(key in response for key in ['board', 'cards', 'links', 'version']) if success else False
+        self.log_result(
+            "Get Board Snapshot", 
+            success and has_required_keys,
+            f"Missing keys in snapshot" if success and not has_required_keys else f"Response: {response}" if not success else "",
+            response
+        )
+        return success and has_required_keys
+
     def test_create_card(self):
         """Test card creation"""
         if not self.board_id:
@@ -270,6 +287,25 @@ class CardFlowAPITester:
         )
         return success and is_list
 
+    def test_get_cards_in_viewport(self):
+        """Test bounding-box card and link queries"""
+        if not self.board_id:
+            self.log_result("Get Cards In Viewport", False, "No board_id available", {})
+            return False
+        
+        success, cards = self.make_request('GET', f'/cards?board_id={self.board_id}&bbox=-10000,-10000,10000,10000')
+        links_ok, links = self.make_request('GET', f'/links?board_id={self.board_id}&bbox=-10000,-10000,10000,10000')
+        rejected, _ = self.make_request('GET', f'/cards?board_id={self.board_id}&bbox=1,2,3', expected_status=400)
+        
+        passed = success and isinstance(cards, list) and links_ok and isinstance(links, list) and rejected
+        self.log_result(
+            "Get Cards In Viewport", 
+            passed,
+            f"Responses: {cards}, {links}" if not passed else "",
+            cards
+        )
+        return passed
+
     def test_update_card(self):
         """Test card update"""
         if not self.card_id:
@@ -293,6 +329,24 @@ class CardFlowAPITester:
         )
         return success
 
+    def test_update_card_positions(self):
+        """Test bulk card position update"""
+        if not self.card_id or not self.board_id:
+            self.log_result("Update Card Positions", False, "Missing card_id or board_id", {})
+            return False
+        
+        positions = [{"card_id": self.card_id, "x": 150.0, "y": 250.0}]
+        success, response = self.make_request('PUT', f'/boards/{self.board_id}/positions', positions)
+        
+        matched = success and response.get('matched') == 1
+        self.log_result(
+            "Update Card Positions", 
+            matched,
+            f"Response: {response}" if not matched else "",
+            response
+        )
+        return matched
+
     def test_create_link(self):
         """Test link creation between cards"""
         if not self.card_id or not self.board_id:
@@ -321,6 +375,7 @@ class CardFlowAPITester:
         link_data = {
             "source_card_id": self.card_id,
             "target_card_id": target_card_id,
+            "board_id": self.board_id,
             "link_type": "depends_on",
             "label": "Test Link"
         }
@@ -329,6 +384,10 @@ class CardFlowAPITester:
         
         if success and 'link_id' in response:
             self.link_id = response['link_id']
+            duplicate_rejected, duplicate = self.make_request('POST', '/links', link_data, expected_status=400)
+            if not duplicate_rejected:
+                self.log_result("Create Link", False, f"Duplicate link not rejected: {duplicate}", duplicate)
+                return False
             self.log_result("Create Link", True, "", response)
         else:
             self.log_result("Create Link", False, f"Response: {response}", response)
@@ -352,6 +411,77 @@ class CardFlowAPITester:
         )
         return success and is_list
 
+    def test_board_changes(self):
+        """Test delta sync from a snapshot's sync token"""
+        if not self.board_id:
+            self.log_result("Board Changes", False, "No board_id available", {})
+            return False
+        
+        success, snapshot = self.make_request('GET', f'/boards/{self.board_id}/snapshot')
+        token = snapshot.get('sync_token') if success else None
+        if not token:
+            self.log_result("Board Changes", False, "Snapshot returned no sync_token", snapshot)
+            return False
+        
+        success, response = self.make_request('GET', f'/boards/{self.board_id}/changes?since={token}')
+        passed = success and response.get('reset') is False and 'next' in response and 'deleted' in response
+        self.log_result(
+            "Board Changes", 
+            passed,
+            f"Response: {response}" if not passed else "",
+            response
+        )
+        return passed
+
+    def test_sync_push(self):
+        """Test pushing an offline operation log, then retrying it"""
+        if not self.board_id:
+            self.log_result("Sync Push", False, "No board_id available", {})
+            return False
+        
+        card_id = f"card_offline{int(datetime.now().timestamp())}"
+        operations = [
+            {"op_id": "1", "entity": "card", "action": "create", "board_id": self.board_id, "id": card_id,
+             "data": {"title": "Offline Card"}, "client_ts": datetime.now().astimezone().isoformat()},
+            {"op_id": "2", "entity": "card", "action": "update", "board_id": self.board_id, "id": card_id,
+             "data": {"status": "planned"}, "client_ts": datetime.now().astimezone().isoformat()}
+        ]
+        success, response = self.make_request('POST', '/sync/push', {"operations": operations})
+        first = [r.get('status') for r in response.get('results', [])] if success else []
+        success_retry, retry = self.make_request('POST', '/sync/push', {"operations": operations[:1]})
+        
+        passed = (success and first == ["applied", "applied"] and success_retry
+                  and retry.get('results', [{}])[0].get('status') == "duplicate")
+        self.log_result(
+            "Sync Push", 
+            passed,
+            f"Responses: {response}, {retry}" if not passed else "",
+            response
+        )
+        return passed
+
+    def test_dependency_graph(self):
+        """Test dependency graph analytics endpoints"""
+        if not self.board_id or not self.card_id:
+            self.log_result("Dependency Graph", False, "Missing board_id or card_id", {})
+            return False
+        
+        base = f'/boards/{self.board_id}/graph'
+        ok_order, order = self.make_request('GET', f'{base}/topological-order')
+        ok_cycles, cycles = self.make_request('GET', f'{base}/cycles')
+        ok_path, path = self.make_request('GET', f'{base}/critical-path')
+        ok_blockers, blockers = self.make_request('GET', f'{base}/blockers/{self.card_id}')
+        
+        passed = (ok_order and 'order' in order and ok_cycles and 'cycles' in cycles
+                  and ok_path and 'path' in path and ok_blockers and 'blockers' in blockers)
+        self.log_result(
+            "Dependency Graph", 
+            passed,
+            f"Responses: {order}, {cycles}, {path}, {blockers}" if not passed else "",
+            path
+        )
+        return passed
+
     def test_search_cards(self):
         """Test card search functionality"""
         if not self.board_id:
@@ -369,6 +499,23 @@ class CardFlowAPITester:
         )
         return success and is_list
 
+    def test_suggest_cards(self):
+        """Test typeahead card suggestions"""
+        if not self.board_id:
+            self.log_result("Suggest Cards", False, "No board_id available", {})
+            return False
+        
+        success, response = self.make_request('GET', f'/boards/{self.board_id}/suggest?q=Tes')
+        
+        is_list = isinstance(response, list) if success else False
+        self.log_result(
+            "Suggest Cards", 
+            success and is_list,
+            f"Expected list, got {type(response)}" if success and not is_list else f"Response: {response}" if not success else "",
+            response
+        )
+        return success and is_list
+
     def test_export_board(self):
         """Test board export"""
         if not self.board_id:
@@ -386,6 +533,54 @@ class CardFlowAPITester:
         )
         return success and has_required_keys
 
+    def test_import_board(self):
+        """Test board import from an export document"""
+        if not self.board_id or not self.workspace_id:
+            self.log_result("Import Board", False, "Missing board_id or workspace_id", {})
+            return False
+        
+        success, export_data = self.make_request('GET', f'/export/{self.board_id}')
+        if not success:
+            self.log_result("Import Board", False, "Failed to export board for import", export_data)
+            return False
+        
+        export_data["workspace_id"] = self.workspace_id
+        success, response = self.make_request('POST', '/import', export_data)
+        
+        imported = success and response.get('cards_imported') == len(export_data.get('cards', []))
+        self.log_result(
+            "Import Board", 
+            imported,
+            f"Response: {response}" if not imported else "",
+            response
+        )
+        return imported
+
+    def test_delete_board(self):
+        """Test soft delete of a board and the background deletion job"""
+        if not self.workspace_id:
+            self.log_result("Delete Board", False, "No workspace_id available", {})
+            return False
+        
+        success, board = self.make_request('POST', '/boards', {"name": "Doomed Board", "workspace_id": self.workspace_id})
+        if not success:
+            self.log_result("Delete Board", False, "Failed to create board", board)
+            return False
+        
+        success, response = self.make_request('DELETE', f'/boards/{board["board_id"]}')
+        job_id = response.get('job_id') if success else None
+        hidden, _ = self.make_request('GET', f'/boards/{board["board_id"]}', expected_status=404)
+        tracked, job = self.make_request('GET', f'/deletions/{job_id}') if job_id else (False, {})
+        
+        passed = success and hidden and tracked and job.get('status') in ('pending', 'running', 'done')
+        self.log_result(
+            "Delete Board", 
+            passed,
+            f"Response: {response}, job: {job}" if not passed else "",
+            job
+        )
+        return passed
+
     def test_logout(self):
         """Test logout functionality"""
         success, response = self.make_request('POST', '/auth/logout')
@@ -416,11 +611,20 @@ class CardFlowAPITester:
             ("Get Boards", self.test_get_boards),
             ("Create Card", self.test_create_card),
             ("Get Cards", self.test_get_cards),
+            ("Get Cards In Viewport", self.test_get_cards_in_viewport),
             ("Update Card", self.test_update_card),
+            ("Update Card Positions", self.test_update_card_positions),
             ("Create Link", self.test_create_link),
             ("Get Links", self.test_get_links),
+            ("Get Board Snapshot", self.test_get_board_snapshot),
+            ("Board Changes", self.test_board_changes),
+            ("Sync Push", self.test_sync_push),
+            ("Dependency Graph", self.test_dependency_graph),
             ("Search Cards", self.test_search_cards),
+            ("Suggest Cards", self.test_suggest_cards),
             ("Export Board", self.test_export_board),
+            ("Import Board", self.test_import_board),
+            ("Delete Board", self.test_delete_board),
             ("Logout", self.test_logout)
         ]
         
@@ -31,4 +31,16 @@ api.interceptors.response.use(
   }
 );
 
+// Follow X-Next-Cursor headers until a paginated list endpoint is exhausted
+export const fetchAllPages = async (path, cursor = null) => {
+  const items = [];
+  const separator = path.includes('?') ? '&' : '?';
+  do {
+    const response = await api.get(cursor ? `${path}${separator}cursor=${encodeURIComponent(cursor)}` : path);
+    items.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return items;
+};
+
 export default api;
@@ -27,7 +27,7 @@ import { ScrollArea } from '../components/ui/scroll-area';
 import { useAuth } from '../contexts/AuthContext';
 import { useTheme } from '../contexts/ThemeContext';
 import { useOffline } from '../contexts/OfflineContext';
-import { api } from '../lib/api';
+import { api, fetchAllPages } from '../lib/api';
 import { toast } from 'sonner';
 import CardNode from '../components/canvas/CardNode';
 import KanbanView from '../components/views/KanbanView';
@@ -112,20 +112,25 @@ export default function BoardView() {
   // Fetch board data
   const fetchBoardData = useCallback(async () => {
     try {
-      const [boardRes, cardsRes, linksRes] = await Promise.all([
-        api.get(`/boards/${boardId}`),
-        api.get(`/cards?board_id=${boardId}`),
-        api.get(`/links?board_id=${boardId}`)
+      // Board, cards and links arrive together in one round trip
+      const { data: snapshot } = await api.get(`/boards/${boardId}/snapshot`);
+
+      // Large boards continue paging from where the snapshot stopped
+      const [moreCards, moreLinks] = await Promise.all([
+        snapshot.cards_next_cursor ? fetchAllPages(`/cards?board_id=${boardId}`, snapshot.cards_next_cursor) : [],
+        snapshot.links_next_cursor ? fetchAllPages(`/links?board_id=${boardId}`, snapshot.links_next_cursor) : []
       ]);
+      const boardCards = [...snapshot.cards, ...moreCards];
+      const boardLinks = [...snapshot.links, ...moreLinks];
 
-      setBoard(boardRes.data);
-      setCards(cardsRes.data);
-      setLinks(linksRes.data);
+      setBoard(snapshot.board);
+      setCards(boardCards);
+      setLinks(boardLinks);
 
       // Cache data
-      await cacheData('boards', boardRes.data);
-      await cacheData('cards', cardsRes.data);
-      await cacheData('links', linksRes.data);
+      await cacheData('boards', snapshot.board);
+      await cacheData('cards', boardCards);
+      await cacheData('links', boardLinks);
     } catch (error) {
       // Try to load from cache
       const cachedCards = await getCachedByIndex('cards', 'board_id', boardId);
@@ -194,22 +199,26 @@ export default function BoardView() {
   }, [cards, links, board?.statuses]);
 
   // Handle node position change
-  const onNodeDragStop = useCallback(async (event, node) => {
+  const onNodeDragStop = useCallback(async (event, node, draggedNodes) => {
+    // Multi-node drags are saved in a single bulk request
+    const moved = draggedNodes?.length ? draggedNodes : [node];
+    const positions = new Map(moved.map(n => [n.id, n.position]));
     try {
-      await api.put(`/cards/${node.id}`, {
-        position_x: node.position.x,
-        position_y: node.position.y
-      });
-      
+      await api.put(`/boards/${boardId}/positions`, moved.map(n => ({
+        card_id: n.id,
+        x: n.position.x,
+        y: n.position.y
+      })));
+
       setCards(prev => prev.map(card =>
-        card.card_id === node.id
-          ? { ...card, position_x: node.position.x, position_y: node.position.y }
+        positions.has(card.card_id)
+          ? { ...card, position_x: positions.get(card.card_id).x, position_y: positions.get(card.card_id).y }
           : card
       ));
     } catch (error) {
       console.error('Failed to save position:', error);
     }
-  }, []);
+  }, [boardId]);
 
   // Handle connection (creating links)
   const onConnect = useCallback((params) => {
@@ -225,6 +234,7 @@ export default function BoardView() {
       const response = await api.post('/links', {
         source_card_id: pendingConnection.source,
         target_card_id: pendingConnection.target,
+        board_id: boardId,
         link_type: linkType
       });
       
@@ -11,7 +11,7 @@ import { Badge } from '../components/ui/badge';
 import { useAuth } from '../contexts/AuthContext';
 import { useTheme } from '../contexts/ThemeContext';
 import { useOffline } from '../contexts/OfflineContext';
-import { api } from '../lib/api';
+import { api, fetchAllPages } from '../lib/api';
 import { toast } from 'sonner';
 import {
   Layers,
@@ -58,13 +58,13 @@ export default function Dashboard() {
   // Fetch workspaces
   const fetchWorkspaces = useCallback(async () => {
     try {
-      const response = await api.get('/workspaces');
-      setWorkspaces(response.data);
-      await cacheData('workspaces', response.data);
+      const workspaceList = await fetchAllPages('/workspaces');
+      setWorkspaces(workspaceList);
+      await cacheData('workspaces', workspaceList);
       
       // Auto-select first workspace if none selected
-      if (response.data.length > 0 && !selectedWorkspace) {
-        setSelectedWorkspace(response.data[0]);
+      if (workspaceList.length > 0 && !selectedWorkspace) {
+        setSelectedWorkspace(workspaceList[0]);
       }
     } catch (error) {
       // Try to load from cache
@@ -89,9 +89,9 @@ export default function Dashboard() {
     }
     
     try {
-      const response = await api.get(`/boards?workspace_id=${selectedWorkspace.workspace_id}`);
-      setBoards(response.data);
-      await cacheData('boards', response.data);
+      const boardList = await fetchAllPages(`/boards?workspace_id=${selectedWorkspace.workspace_id}`);
+      setBoards(boardList);
+      await cacheData('boards', boardList);
     } catch (error) {
       const cached = await getCachedData('boards');
       if (cached) {
@@ -0,0 +1,33 @@
+"""
+Shared fixtures: server handlers run against the in-memory fake database with an already resolved user.
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "cardflow_test")
+
+import server  # noqa: E402
+
+from tests.fake_db import FakeDatabase  # noqa: E402
+
+USER = {"user_id": "user_test", "email": "test@cardflow.test", "name": "Test User"}
+
+class FakeRequest:
+    headers = {}
+
+def run(coro):
+    return asyncio.run(coro)
+
+@pytest.fixture
+def fake_db(monkeypatch) -> FakeDatabase:
+    fake = FakeDatabase()
+    monkeypatch.setattr(server, "db", fake)
+    monkeypatch.setattr(server, "user_cache", server.UserCache(100, 30))
+    return fake
@@ -0,0 +1,239 @@
+"""
+Minimal in-memory stand-in for the Motor database, counting every call.
+
+Supports only the query operators the server uses on the paths under test.
+"""
+
+import asyncio
+import re
+from collections import Counter
+from datetime import datetime
+
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+def matches(doc: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, branch) for branch in condition):
+                return False
+            continue
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            if not satisfies(value, condition):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+BSON_TYPES = {"string": str, "date": datetime}
+
+def satisfies(value, condition: dict) -> bool:
+    for op, operand in condition.items():
+        if op == "$in" and value not in operand:
+            return False
+        if op == "$lte" and not (value is not None and value <= operand):
+            return False
+        if op == "$gte" and not (value is not None and value >= operand):
+            return False
+        if op == "$gt" and not (isinstance(value, type(operand)) and value > operand):
+            return False
+        if op == "$type" and not isinstance(value, BSON_TYPES[operand]):
+            return False
+        if op == "$not" and satisfies(value, operand):
+            return False
+        if op == "$regex":
+            flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+            values = value if isinstance(value, list) else [value]
+            if not any(isinstance(v, str) and re.search(operand, v, flags) for v in values):
+                return False
+    return True
+
+def bson_order(value) -> tuple:
+    # Missing, then numbers, then strings, then dates, as MongoDB compares mixed types
+    for rank, kind in enumerate((type(None), (int, float), str, datetime)):
+        if isinstance(value, kind):
+            return rank, value
+    return rank + 1, value
+
+def project(doc: dict, projection) -> dict:
+    result = dict(doc)
+    if projection and projection.get("_id") == 0:
+        result.pop("_id", None)
+    return result
+
+class FakeResult:
+    def __init__(self, **counts):
+        self.__dict__.update(counts)
+
+class FakeCursor:
+    def __init__(self, docs: list):
+        self.docs = docs
+
+    def sort(self, key, direction=1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        # Stable sorts from the last key back; $meta scores are left in match order
+        for field, direction in reversed(keys):
+            if isinstance(direction, int):
+                self.docs.sort(key=lambda doc: bson_order(doc.get(field)), reverse=direction < 0)
+        return self
+
+    def batch_size(self, n: int):
+        return self
+
+    def limit(self, n: int):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            # Yield to the loop between documents, like a real cursor fetching batches
+            await asyncio.sleep(0)
+            yield doc
+
+class FakeCollection:
+    def __init__(self, name: str, ops: Counter):
+        self.name = name
+        self.ops = ops
+        self.docs = []
+        self.next_id = 0
+        self.unique = []  # tuples of field names, like a unique compound index
+
+    def _count(self, op: str):
+        self.ops[f"{self.name}.{op}"] += 1
+
+    def _apply(self, doc: dict, update: dict):
+        for key, value in update.get("$set", {}).items():
+            target = doc
+            *path, leaf = key.split(".")
+            for part in path:
+                target = target.setdefault(part, {})
+            target[leaf] = value
+        for key, amount in update.get("$inc", {}).items():
+            target = doc
+            *path, leaf = key.split(".")
+            for part in path:
+                target = target.setdefault(part, {})
+            target[leaf] = target.get(leaf, 0) + amount
+
+    async def find_one(self, query, projection=None):
+        self._count("find_one")
+        for doc in self.docs:
+            if matches(doc, query):
+                return project(doc, projection)
+        return None
+
+    def find(self, query, projection=None):
+        self._count("find")
+        if "$text" in query:
+            # No text index in the fake, as when cards_text_search failed to build
+            raise OperationFailure("text index required for $text query", code=27)
+        return FakeCursor([project(doc, projection) for doc in self.docs if matches(doc, query)])
+
+    async def distinct(self, key, query):
+        self._count("distinct")
+        return list({doc.get(key) for doc in self.docs if matches(doc, query)})
+
+    async def insert_one(self, doc):
+        self._count("insert_one")
+        for fields in self.unique:
+            if any(all(other.get(f) == doc.get(f) for f in fields) for other in self.docs):
+                raise DuplicateKeyError(f"duplicate key on {fields}")
+        self.next_id += 1
+        doc["_id"] = f"oid_{self.name}_{self.next_id}"
+        self.docs.append(dict(doc))
+
+    async def insert_many(self, docs, ordered=True):
+        self._count("insert_many")
+        for doc in docs:
+            self.next_id += 1
+            doc["_id"] = f"oid_{self.name}_{self.next_id}"
+            self.docs.append(dict(doc))
+
+    async def update_one(self, query, update):
+        self._count("update_one")
+        for doc in self.docs:
+            if matches(doc, query):
+                self._apply(doc, update)
+                return FakeResult(matched_count=1, modified_count=1)
+        return FakeResult(matched_count=0, modified_count=0)
+
+    async def update_many(self, query, update):
+        self._count("update_many")
+        hits = [doc for doc in self.docs if matches(doc, query)]
+        for doc in hits:
+            self._apply(doc, update)
+        return FakeResult(matched_count=len(hits), modified_count=len(hits))
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None, sort=None):
+        self._count("find_one_and_update")
+        for doc in self.docs:
+            if matches(doc, query):
+                self._apply(doc, update)
+                return project(doc, projection)
+        return None
+
+    async def bulk_write(self, requests, ordered=True):
+        self._count("bulk_write")
+        counts = Counter()
+        errors = []
+        for index, request in enumerate(requests):
+            if isinstance(request, InsertOne):
+                doc = request._doc
+                if any(all(other.get(f) == doc.get(f) for f in fields) for fields in self.unique for other in self.docs):
+                    errors.append({"index": index, "code": 11000, "errmsg": "duplicate key"})
+                    if ordered:
+                        break
+                    continue
+                self.next_id += 1
+                doc["_id"] = f"oid_{self.name}_{self.next_id}"
+                self.docs.append(dict(doc))
+                counts["inserted_count"] += 1
+            elif isinstance(request, UpdateOne):
+                for doc in self.docs:
+                    if matches(doc, request._filter):
+                        self._apply(doc, request._doc)
+                        counts["matched_count"] += 1
+                        counts["modified_count"] += 1
+                        break
+            elif isinstance(request, DeleteOne):
+                for doc in self.docs:
+                    if matches(doc, request._filter):
+                        self.docs.remove(doc)
+                        counts["deleted_count"] += 1
+                        break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": counts["inserted_count"]})
+        return FakeResult(inserted_count=counts["inserted_count"], matched_count=counts["matched_count"],
+                          modified_count=counts["modified_count"], deleted_count=counts["deleted_count"])
+
+    async def delete_one(self, query):
+        self._count("delete_one")
+        for doc in self.docs:
+            if matches(doc, query):
+                self.docs.remove(doc)
+                return FakeResult(deleted_count=1)
+        return FakeResult(deleted_count=0)
+
+    async def delete_many(self, query):
+        self._count("delete_many")
+        keep = [doc for doc in self.docs if not matches(doc, query)]
+        deleted = len(self.docs) - len(keep)
+        self.docs = keep
+        return FakeResult(deleted_count=deleted)
+
+class FakeDatabase:
+    def __init__(self):
+        self.ops = Counter()
+        self.collections = {}
+
+    def __getattr__(self, name):
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(name, self.ops)
+        return self.collections[name]
+
+    def __getitem__(self, name):
+        return getattr(self, name)
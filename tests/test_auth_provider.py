@@ -0,0 +1,84 @@
+"""
+OAuth session exchange client against a local stub auth provider.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+class StubProvider(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        stub = self.server
+        stub.connections.add(self.client_address)
+        stub.calls += 1
+        status, delay = stub.script.pop(0) if stub.script else (200, 0)
+        time.sleep(delay)
+        body = json.dumps({
+            "email": "oauth@cardflow.test", "name": "OAuth User", "session_token": self.headers["X-Session-ID"]
+        }).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubProvider)
+    httpd.connections, httpd.calls, httpd.script = set(), 0, []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def provider(stub, read_timeout: float = 2.0, retries: int = 2) -> server.AuthProviderClient:
+    url = f"http://127.0.0.1:{stub.server_address[1]}/session-data"
+    return server.AuthProviderClient(url, 1.0, read_timeout, 4, retries, 1)
+
+def exchange(client: server.AuthProviderClient, *session_ids):
+    async def go():
+        try:
+            return [await client.session_data(session_id) for session_id in session_ids]
+        finally:
+            await client.stop()
+    return asyncio.run(go())
+
+def test_connections_are_kept_alive(stub):
+    client = provider(stub)
+    results = exchange(client, "s1", "s2", "s3", "s4", "s5")
+    assert [r["session_token"] for r in results] == ["s1", "s2", "s3", "s4", "s5"]
+    assert len(stub.connections) == 1
+    assert client.stats()["requests"] == 5 and client.stats()["p50_ms"] is not None
+
+def test_server_errors_are_retried(stub):
+    stub.script = [(503, 0), (502, 0)]
+    client = provider(stub)
+    assert exchange(client, "s1")[0]["email"] == "oauth@cardflow.test"
+    assert stub.calls == 3 and client.retried == 2
+
+def test_rejected_session_is_not_retried(stub):
+    stub.script = [(401, 0)]
+    client = provider(stub)
+    assert exchange(client, "bad") == [None]
+    assert stub.calls == 1
+
+def test_read_timeout_gives_up_after_retries(stub):
+    stub.script = [(200, 0.5)] * 3
+    client = provider(stub, read_timeout=0.1, retries=2)
+    with pytest.raises(HTTPException) as exc:
+        exchange(client, "slow")
+    assert exc.value.status_code == 502
+    assert stub.calls == 3 and client.failures == 1
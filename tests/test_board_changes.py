@@ -0,0 +1,53 @@
+"""
+Delta sync: only what changed since a token comes back, with tombstones for deletions.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import Response
+
+import server
+
+from tests.conftest import USER, FakeRequest, run
+
+@pytest.fixture
+def board(fake_db):
+    fake = fake_db
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    board = run(server.create_board(server.BoardCreate(name="Board", workspace_id=ws["workspace_id"]), user=USER))
+    # 5,000 cards last written an hour ago
+    hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+    fake.boards.docs[0]["updated_at"] = hour_ago
+    fake.cards.docs = [{
+        "_id": i, "card_id": f"card_{i:05d}", "title": f"Card {i} " + "lorem ipsum " * 10, "description": "x" * 200,
+        "card_type": "task", "status": "idea", "board_id": board["board_id"], "position_x": i, "position_y": i,
+        "created_by": USER["user_id"], "created_at": hour_ago, "updated_at": hour_ago
+    } for i in range(5000)]
+    return {"board_id": board["board_id"], "db": fake, "since": str(int((hour_ago + timedelta(minutes=30)).timestamp() * 1000))}
+
+def test_three_edits_cost_a_few_kilobytes(board):
+    full = run(server.get_board_snapshot(board["board_id"], FakeRequest(), Response(), user=USER))
+    full_size = len(server.BoardSnapshot.model_validate(full).model_dump_json())
+
+    for i in (1, 2, 3):
+        run(server.update_card(f"card_{i:05d}", server.CardUpdate(title=f"Edited {i}"), user=USER))
+    changes = run(server.board_changes(board["board_id"], since=board["since"], user=USER))
+
+    assert not changes["reset"]
+    assert [card["title"] for card in changes["cards"]] == ["Edited 1", "Edited 2", "Edited 3"]
+    delta_size = len(server.BoardChanges.model_validate(changes).model_dump_json())
+    assert delta_size < 4096 < full_size
+    assert int(changes["next"]) > int(board["since"])
+
+def test_deletions_come_back_as_tombstones(board):
+    run(server.create_link(server.LinkCreate(source_card_id="card_00001", target_card_id="card_00002"), user=USER))
+    run(server.delete_card("card_00001", user=USER))
+    changes = run(server.board_changes(board["board_id"], since=board["since"], user=USER))
+    assert changes["deleted"]["cards"] == ["card_00001"]
+    assert len(changes["deleted"]["links"]) == 1
+
+def test_missing_or_expired_token_asks_for_reset(board):
+    assert run(server.board_changes(board["board_id"], since=None, user=USER))["reset"]
+    expired = str(int((datetime.now(timezone.utc) - timedelta(days=server.SYNC_TOMBSTONE_DAYS + 1)).timestamp() * 1000))
+    assert run(server.board_changes(board["board_id"], since=expired, user=USER))["reset"]
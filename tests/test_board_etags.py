@@ -0,0 +1,44 @@
+"""
+Board version counters and ETag / If-None-Match on card reads.
+"""
+
+from types import SimpleNamespace
+
+from fastapi import Response
+
+import server
+
+from tests.conftest import USER, FakeRequest, run
+
+def make_board() -> dict:
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    board = run(server.create_board(server.BoardCreate(name="Board", workspace_id=ws["workspace_id"]), user=USER))
+    card = run(server.create_card(server.CardCreate(title="Card", board_id=board["board_id"]), user=USER))
+    return {"board_id": board["board_id"], "card_id": card["card_id"]}
+
+def get_cards(board_id: str, request, response: Response):
+    return run(server.get_cards(board_id, request, response, bbox=None, limit=100, cursor=None, user=USER))
+
+def test_writes_change_the_etag_and_matching_requests_skip_the_read(fake_db):
+    board = make_board()
+    first = Response()
+    get_cards(board["board_id"], FakeRequest(), first)
+    version = fake_db.boards.docs[0]["version"]
+
+    run(server.update_card(board["card_id"], server.CardUpdate(title="Renamed"), user=USER))
+    second = Response()
+    get_cards(board["board_id"], FakeRequest(), second)
+    assert fake_db.boards.docs[0]["version"] == version + 1
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+    fake_db.ops.clear()
+    request = SimpleNamespace(headers={"if-none-match": second.headers["ETag"]})
+    cached = get_cards(board["board_id"], request, Response())
+    assert cached.status_code == 304 and cached.headers["ETag"] == second.headers["ETag"]
+    assert fake_db.ops["cards.find"] == 0
+
+    # A stale tag gets the full body again
+    request = SimpleNamespace(headers={"if-none-match": first.headers["ETag"]})
+    cards = get_cards(board["board_id"], request, Response())
+    assert [card["title"] for card in cards] == ["Renamed"]
+
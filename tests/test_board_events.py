@@ -0,0 +1,87 @@
+"""
+Board change feed: per-board fan-out, the resync marker for slow subscribers and cleanup on disconnect.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import server
+
+from tests.conftest import USER, run
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = server.LocalEventBroker(queue_size=3)
+    monkeypatch.setattr(server, "event_broker", broker)
+    return broker
+
+class ClientRequest:
+    def __init__(self):
+        self.connected = True
+
+    async def is_disconnected(self) -> bool:
+        return not self.connected
+
+def drain(queue: asyncio.Queue) -> list:
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+def test_events_fan_out_to_every_subscriber_of_the_board(fake_db, broker):
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    board_id = run(server.create_board(server.BoardCreate(name="Board", workspace_id=ws["workspace_id"]), user=USER))["board_id"]
+    first, second = broker.subscribe(board_id), broker.subscribe(board_id)
+    elsewhere = broker.subscribe("board_other")
+
+    card = run(server.create_card(server.CardCreate(title="Card", board_id=board_id), user=USER))
+    for queue in (first, second):
+        [event] = drain(queue)
+        assert (event["type"], event["version"], event["card"]["card_id"]) == ("card.created", 1, card["card_id"])
+    assert elsewhere.empty()
+
+def test_a_subscriber_that_falls_behind_gets_one_resync_marker(broker):
+    slow, fresh = broker.subscribe("board_1"), broker.subscribe("board_1")
+    for n in range(4):
+        run(broker.publish("board_1", {"type": "card.updated", "n": n}))
+        if n == 2:
+            drain(fresh)
+    assert drain(slow) == [{"type": "resync", "board_id": "board_1"}]
+    # Subscribers with room keep receiving events as usual
+    assert drain(fresh) == [{"type": "card.updated", "n": 3}]
+
+def test_stream_unsubscribes_when_the_client_goes_away(broker, monkeypatch):
+    monkeypatch.setattr(server, "EVENT_KEEPALIVE_SECONDS", 0.01)
+
+    async def session():
+        request = ClientRequest()
+        queue = broker.subscribe("board_1")
+        stream = server.board_event_stream(request, "board_1", queue)
+        frames = [await stream.__anext__()]
+        await broker.publish("board_1", {"type": "card.deleted", "card_id": "card_1"})
+        frames.append(await stream.__anext__())
+        frames.append(await stream.__anext__())
+        request.connected = False
+        frames += [frame async for frame in stream]
+        return frames
+
+    frames = run(session())
+    assert frames[0] == "retry: 3000\n\n"
+    event, data = frames[1].splitlines()[:2]
+    assert event == "event: card.deleted" and json.loads(data[len("data: "):])["card_id"] == "card_1"
+    assert frames[2] == ": keepalive\n\n" and len(frames) == 3
+    assert not broker.subscribers
+
+def test_stream_closed_by_the_server_unsubscribes(broker):
+    async def session():
+        queue = broker.subscribe("board_1")
+        stream = server.board_event_stream(ClientRequest(), "board_1", queue)
+        await stream.__anext__()
+        assert broker.subscribers
+        # Starlette closes the generator when the response is cancelled
+        await stream.aclose()
+
+    run(session())
+    assert not broker.subscribers
@@ -0,0 +1,95 @@
+"""
+Soft deletes and the background deletion reaper, run against the in-memory fake database.
+"""
+
+import pytest
+from fastapi import HTTPException, Response
+
+import server
+
+from tests.conftest import USER, FakeRequest, run
+
+@pytest.fixture
+def reaper(monkeypatch):
+    reaper = server.DeletionReaper(batch_size=3, pause_ms=0)
+    monkeypatch.setattr(server, "deletion_reaper", reaper)
+    return reaper
+
+def seed(boards: int = 2, cards: int = 7) -> dict:
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    board_ids = []
+    for b in range(boards):
+        board = run(server.create_board(server.BoardCreate(name=f"Board {b}", workspace_id=ws["workspace_id"]), user=USER))
+        card_ids = [
+            run(server.create_card(server.CardCreate(title=f"Card {i}", board_id=board["board_id"]), user=USER))["card_id"]
+            for i in range(cards)
+        ]
+        for source, target in zip(card_ids, card_ids[1:]):
+            run(server.create_link(server.LinkCreate(source_card_id=source, target_card_id=target), user=USER))
+        board_ids.append(board["board_id"])
+    return {"workspace_id": ws["workspace_id"], "board_ids": board_ids}
+
+def test_deleted_board_is_hidden_before_reaping(fake_db, reaper):
+    state = seed(boards=1)
+    board_id = state["board_ids"][0]
+    result = run(server.delete_board(board_id, user=USER))
+    assert result["job_id"]
+    # Children still exist, but nothing reaches them through the API
+    assert len(fake_db.cards.docs) == 7
+    with pytest.raises(HTTPException) as exc:
+        run(server.get_board(board_id, request=None, response=None, user=USER))
+    assert exc.value.status_code == 404
+    card_id = fake_db.cards.docs[0]["card_id"]
+    with pytest.raises(HTTPException):
+        run(server.get_card(card_id, user=USER))
+
+def test_reaper_removes_children_in_batches(fake_db, reaper):
+    state = seed(boards=2)
+    job = run(server.delete_workspace(state["workspace_id"], user=USER))
+    fake_db.ops.clear()
+
+    claimed = run(reaper.claim())
+    run(reaper.process(claimed))
+
+    assert not fake_db.cards.docs and not fake_db.links.docs and not fake_db.boards.docs
+    assert not fake_db.workspaces.docs
+    # 7 cards per board at 3 per batch -> 3 card batches and 2 link batches per board
+    assert fake_db.ops["cards.delete_many"] == 6
+    assert fake_db.ops["links.delete_many"] == 4
+    status = run(server.get_deletion(job["job_id"], user=USER))
+    assert status["status"] == "done"
+    assert status["deleted"] == {"boards": 2, "cards": 14, "links": 12}
+
+def test_interrupted_job_resumes_after_lease(fake_db, reaper, monkeypatch):
+    state = seed(boards=1)
+    job = run(server.delete_board(state["board_ids"][0], user=USER))
+    claimed = run(reaper.claim())
+
+    original = reaper.checkpoint
+
+    async def crash_after_first_batch(*args):
+        await original(*args)
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr(reaper, "checkpoint", crash_after_first_batch)
+    run(reaper.process(claimed))
+    assert 0 < len(fake_db.cards.docs) < 7
+
+    # Still leased, so nobody else picks it up yet
+    assert run(reaper.claim()) is None
+    stored = fake_db.delete_jobs.docs[0]
+    stored["lease_until"] = stored["created_at"]
+
+    monkeypatch.setattr(reaper, "checkpoint", original)
+    run(reaper.process(run(reaper.claim())))
+    assert not fake_db.cards.docs and not fake_db.links.docs and not fake_db.boards.docs
+    assert run(server.get_deletion(job["job_id"], user=USER))["status"] == "done"
+
+def test_board_update_cannot_soft_delete(fake_db, reaper):
+    board_id = seed(boards=1)["board_ids"][0]
+    version = fake_db.boards.docs[0]["version"]
+    run(server.update_board(board_id, {"name": "Renamed", "deleted_at": "x", "version": 99}, user=USER))
+    board = fake_db.boards.docs[0]
+    assert board["name"] == "Renamed" and board["version"] == version + 1
+    assert board.get("deleted_at") is None
+    assert run(server.get_board(board_id, request=FakeRequest(), response=Response(), user=USER))["name"] == "Renamed"
@@ -0,0 +1,61 @@
+"""
+DependencyGraph algorithms on small hand-built boards.
+"""
+
+import server
+
+def card(card_id: str, status: str = "idea", due_date: str = None) -> dict:
+    return {"card_id": card_id, "title": card_id.upper(), "status": status, "due_date": due_date}
+
+def link(source: str, target: str, link_type: str = "blocks") -> dict:
+    return {"source_card_id": source, "target_card_id": target, "link_type": link_type}
+
+def ids(graph: server.DependencyGraph, indexes) -> list:
+    return [graph.cards[i]["card_id"] for i in indexes]
+
+def test_link_types_set_edge_direction():
+    graph = server.DependencyGraph(
+        [card("a"), card("b"), card("c"), card("d")],
+        [link("a", "b"), link("c", "b", "depends_on"), link("b", "d", "related_to")]
+    )
+    # a blocks b; c depends on b, so b comes first; related_to is not a dependency
+    order = ids(graph, graph.topological_order())
+    assert order.index("a") < order.index("b") < order.index("c")
+    assert graph.edges == 2
+
+def test_cycles_are_reported_and_left_unordered():
+    graph = server.DependencyGraph(
+        [card("a"), card("b"), card("c"), card("d"), card("e")],
+        [link("a", "b"), link("b", "c"), link("c", "b"), link("c", "d"), link("e", "e")]
+    )
+    assert ids(graph, graph.topological_order()) == ["a"]
+    cycles = sorted(sorted(ids(graph, component)) for component in graph.cycles())
+    assert cycles == [["b", "c"], ["e"]]
+
+def test_acyclic_board_has_no_cycles():
+    graph = server.DependencyGraph([card("a"), card("b")], [link("a", "b")])
+    assert graph.cycles() == []
+
+def test_critical_path_skips_finished_cards_and_flags_due_dates():
+    graph = server.DependencyGraph(
+        [
+            card("a", due_date="2026-03-01"),
+            card("b", due_date="2026-02-01"),
+            card("c"),
+            card("x", status="done"),
+            card("y"),
+        ],
+        [link("a", "b"), link("b", "c"), link("x", "y")]
+    )
+    result = graph.critical_path()
+    assert ids(graph, result["path"]) == ["a", "b", "c"]
+    # b is due before a, which blocks it
+    assert [(graph.cards[u]["card_id"], graph.cards[p]["card_id"]) for u, p in result["conflicts"]] == [("b", "a")]
+
+def test_blockers_are_transitive_and_stop_at_finished_cards():
+    graph = server.DependencyGraph(
+        [card("a"), card("b"), card("c"), card("d", status="Done"), card("e")],
+        [link("a", "b"), link("b", "c"), link("e", "d"), link("d", "c")]
+    )
+    blockers = {graph.cards[i]["card_id"]: depth for i, depth in graph.blockers("c")}
+    assert blockers == {"b": 1, "a": 2}
@@ -0,0 +1,81 @@
+"""
+Streaming board export: JSON and NDJSON framing, gzip output and ETag / If-None-Match.
+"""
+
+import gzip
+import json
+import zlib
+from types import SimpleNamespace
+
+import pytest
+
+import server
+
+from tests.conftest import USER, FakeRequest, run
+
+@pytest.fixture
+def board(fake_db, monkeypatch):
+    # Small chunks so every export spans several of them
+    monkeypatch.setattr(server, "EXPORT_CHUNK_BYTES", 256)
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    board = run(server.create_board(server.BoardCreate(name="Board", workspace_id=ws["workspace_id"]), user=USER))
+    cards = [
+        run(server.create_card(server.CardCreate(title=f"Card {i}", board_id=board["board_id"]), user=USER))["card_id"]
+        for i in range(12)
+    ]
+    for source, target in zip(cards, cards[1:4]):
+        run(server.create_link(server.LinkCreate(source_card_id=source, target_card_id=target), user=USER))
+    return board["board_id"]
+
+def export(board_id: str, request=None, **params):
+    params = {"export_format": "json", "gzip": False, **params}
+    return run(server.export_board(board_id, request or FakeRequest(), user=USER, **params))
+
+def chunks(response) -> list:
+    async def collect():
+        return [chunk async for chunk in response.body_iterator]
+    return run(collect())
+
+def test_json_export_is_one_document(board):
+    response = export(board)
+    parts = chunks(response)
+    assert len(parts) > 2 and response.media_type == "application/json"
+    document = json.loads(b"".join(parts))
+    assert document["board"]["board_id"] == board
+    assert len(document["cards"]) == 12 and len(document["links"]) == 3
+    assert [card["card_id"] for card in document["cards"]] == sorted(card["card_id"] for card in document["cards"])
+    assert "exported_at" in document
+
+def test_ndjson_export_is_one_record_per_line(board):
+    response = export(board, export_format="ndjson")
+    body = b"".join(chunks(response)).decode()
+    assert body.endswith("\n") and response.media_type == "application/x-ndjson"
+    types = [json.loads(line)["type"] for line in body.splitlines()]
+    assert types == ["board"] + ["card"] * 12 + ["link"] * 3 + ["end"]
+
+@pytest.mark.parametrize("export_format", ["json", "ndjson"])
+def test_gzip_export_decompresses_chunk_by_chunk(board, export_format):
+    response = export(board, export_format=export_format, gzip=True)
+    assert response.headers["content-encoding"] == "gzip"
+    parts = chunks(response)
+    # Every chunk is sync-flushed, so a client can decode each one as it arrives
+    decompressor = zlib.decompressobj(47)
+    decoded = [decompressor.decompress(part) for part in parts]
+    assert all(decoded[:-1]) and decompressor.eof
+    body = b"".join(decoded)
+    assert body == gzip.decompress(b"".join(parts))
+    plain = b"".join(chunks(export(board, export_format=export_format)))
+    # Identical apart from the export timestamp
+    assert body.rsplit(b"exported_at", 1)[0] == plain.rsplit(b"exported_at", 1)[0]
+
+def test_matching_etag_skips_the_export(board, fake_db):
+    first = export(board)
+    etag = first.headers["etag"]
+    fake_db.ops.clear()
+    cached = export(board, request=SimpleNamespace(headers={"if-none-match": etag}))
+    assert cached.status_code == 304
+    assert fake_db.ops["cards.find"] == 0 and fake_db.ops["links.find"] == 0
+
+    run(server.update_card(fake_db.cards.docs[0]["card_id"], server.CardUpdate(title="Renamed"), user=USER))
+    fresh = export(board, request=SimpleNamespace(headers={"if-none-match": etag}))
+    assert fresh.status_code == 200 and fresh.headers["etag"] != etag
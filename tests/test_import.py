@@ -0,0 +1,67 @@
+"""
+Board import: corrupt gzip bodies and malformed board records are reported instead of failing with a 500.
+"""
+
+import gzip
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+from tests.conftest import USER, run
+
+class UploadRequest:
+    def __init__(self, body: bytes, content_type: str, chunk_size: int = 64):
+        self.headers = {"content-type": content_type, "content-encoding": "gzip"}
+        self._body = body
+        self.chunk_size = chunk_size
+
+    async def body(self) -> bytes:
+        return self._body
+
+    async def stream(self):
+        for start in range(0, len(self._body), self.chunk_size):
+            yield self._body[start:start + self.chunk_size]
+
+def workspace_id() -> str:
+    return run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))["workspace_id"]
+
+def test_corrupt_gzip_document_is_a_400(fake_db):
+    request = UploadRequest(b"\x1f\x8b\x08\x00not really gzip", "application/json")
+    with pytest.raises(HTTPException) as exc:
+        run(server.import_board(request, workspace_id=workspace_id(), user=USER))
+    assert exc.value.status_code == 400
+    assert not fake_db.boards.docs
+
+@pytest.mark.parametrize("damage", ["corrupt", "truncated"])
+def test_corrupt_gzip_stream_keeps_what_was_read(fake_db, damage):
+    lines = [json.dumps({"type": "board", "data": {"name": "Imported"}})]
+    lines += [json.dumps({"type": "card", "data": {"title": f"Card {i}"}}) for i in range(50)]
+    body = gzip.compress(("\n".join(lines) + "\n").encode())
+    body = body[:len(body) // 2] + (b"\x00" * 64 if damage == "corrupt" else b"")
+
+    report = run(server.import_board(UploadRequest(body, "application/x-ndjson"), workspace_id=workspace_id(), user=USER))
+    assert report["error_count"] == 1 and "Invalid gzip body" in report["errors"][0]["error"]
+    assert report["message"] == "Board imported with errors"
+    assert len(fake_db.boards.docs) == 1
+    assert report["cards_imported"] == len(fake_db.cards.docs)
+
+def test_malformed_board_record_is_reported(fake_db):
+    lines = [json.dumps({"type": "board", "data": "x"}),
+             json.dumps({"type": "card", "data": {"card_id": "c1", "title": "First"}})]
+    body = gzip.compress("\n".join(lines).encode())
+    result = run(server.import_board(UploadRequest(body, "application/x-ndjson"), workspace_id=workspace_id(), user=USER))
+    assert result["error_count"] == 1 and result["errors"][0]["line"] == 1
+    assert result["errors"][0]["error"].startswith("Invalid board")
+    # The cards still land on a board created with the defaults
+    assert result["cards_imported"] == 1
+    assert [board["name"] for board in fake_db.boards.docs] == ["Imported Board"]
+
+@pytest.mark.parametrize("board", ["x", ["Board"], {"name": None}, {"statuses": "todo"}])
+def test_non_object_board_in_a_document_is_reported(fake_db, board):
+    body = gzip.compress(json.dumps({"board": board, "cards": [{"title": "Only"}]}).encode())
+    result = run(server.import_board(UploadRequest(body, "application/json"), workspace_id=workspace_id(), user=USER))
+    assert result["error_count"] == 1 and result["cards_imported"] == 1
+    assert len(fake_db.boards.docs) == 1
@@ -0,0 +1,63 @@
+"""
+Prometheus metrics: HTTP middleware, Mongo listeners and the /metrics endpoint.
+"""
+
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+import metrics
+import server
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_requests_are_labelled_by_route_template():
+    client = TestClient(server.app)
+    health = {"method": "GET", "route": "/api/health", "status": "200"}
+    missing = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = sample("cardflow_http_request_duration_seconds_count", **health)
+    before_missing = sample("cardflow_http_request_duration_seconds_count", **missing)
+
+    assert client.get("/api/health").status_code == 200
+    assert client.get("/api/no-such-route/123").status_code == 404
+
+    assert sample("cardflow_http_request_duration_seconds_count", **health) == before + 1
+    assert sample("cardflow_http_request_duration_seconds_count", **missing) == before_missing + 1
+    assert sample("cardflow_http_requests_in_progress", method="GET") == 0
+
+def test_metrics_endpoint_includes_component_stats():
+    response = TestClient(server.app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    for name in ("cardflow_bcrypt_pending", "cardflow_user_cache_hits", "cardflow_position_buffer_pending",
+                 "cardflow_graph_cache_builds", "cardflow_auth_provider_requests"):
+        assert f"\n{name} " in body
+
+def test_command_listener_pairs_events_by_request():
+    listener = metrics.MongoCommandMetrics()
+    labels = {"collection": "cards", "command": "find"}
+    before = sample("cardflow_mongo_command_duration_seconds_count", **labels)
+    failures = sample("cardflow_mongo_command_failures_total", **labels)
+
+    for request_id in (1, 2):
+        listener.started(SimpleNamespace(command={"find": "cards", "filter": {}}, command_name="find",
+                                         connection_id=("db", 27017), request_id=request_id))
+    listener.succeeded(SimpleNamespace(command_name="find", connection_id=("db", 27017), request_id=1, duration_micros=1500))
+    listener.failed(SimpleNamespace(command_name="find", connection_id=("db", 27017), request_id=2, duration_micros=900))
+
+    assert sample("cardflow_mongo_command_duration_seconds_count", **labels) == before + 2
+    assert sample("cardflow_mongo_command_failures_total", **labels) == failures + 1
+    assert not listener.collections
+
+def test_pool_listener_times_checkouts():
+    listener = metrics.MongoPoolMetrics()
+    before = sample("cardflow_mongo_pool_checkout_wait_seconds_count")
+    listener.connection_check_out_started(None)
+    listener.connection_checked_out(None)
+    listener.connection_check_out_started(None)
+    listener.connection_check_out_failed(SimpleNamespace(reason="timeout"))
+    assert sample("cardflow_mongo_pool_checkout_wait_seconds_count") == before + 2
+    assert sample("cardflow_mongo_pool_checkout_failures_total", reason="timeout") >= 1
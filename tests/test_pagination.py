@@ -0,0 +1,57 @@
+"""
+Workspace and board lists page in creation order, whatever order their random ids sort in.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException, Response
+
+import server
+
+from tests.conftest import USER, run
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def all_pages(list_route, **params) -> list:
+    items, cursor = [], None
+    while True:
+        response = Response()
+        items += run(list_route(response, limit=2, cursor=cursor, user=USER, **params))
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return items
+
+def workspace(workspace_id: str, minutes: int) -> dict:
+    return {"workspace_id": workspace_id, "name": workspace_id, "description": "", "color": "#4F46E5",
+            "owner_id": USER["user_id"], "created_at": START + timedelta(minutes=minutes), "updated_at": START}
+
+def test_workspaces_are_listed_oldest_first(fake_db):
+    # Ids sort in the opposite order to creation, and two share a timestamp
+    fake_db.workspaces.docs += [workspace("ws_f", 0), workspace("ws_e", 1), workspace("ws_d", 2),
+                                workspace("ws_b", 3), workspace("ws_c", 3), workspace("ws_a", 4)]
+    listed = [ws["workspace_id"] for ws in all_pages(server.get_workspaces)]
+    assert listed == ["ws_f", "ws_e", "ws_d", "ws_b", "ws_c", "ws_a"]
+
+def test_unmigrated_string_timestamps_page_ahead_of_dates(fake_db):
+    legacy = [workspace(f"ws_legacy_{n}", minutes) for n, minutes in ((1, 2), (2, 0), (3, 1))]
+    for ws in legacy:
+        ws["created_at"] = ws["created_at"].isoformat()
+    fake_db.workspaces.docs += legacy + [workspace("ws_new_1", 10), workspace("ws_new_2", 5)]
+    listed = [ws["workspace_id"] for ws in all_pages(server.get_workspaces)]
+    assert listed == ["ws_legacy_2", "ws_legacy_3", "ws_legacy_1", "ws_new_2", "ws_new_1"]
+
+def test_boards_are_listed_oldest_first(fake_db):
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    created = [
+        run(server.create_board(server.BoardCreate(name=f"Board {i}", workspace_id=ws["workspace_id"]), user=USER))["board_id"]
+        for i in range(5)
+    ]
+    assert [board["board_id"] for board in all_pages(server.get_boards, workspace_id=ws["workspace_id"])] == created
+    assert [board["board_id"] for board in all_pages(server.get_boards, workspace_id=None)] == created
+
+def test_malformed_cursor_is_rejected(fake_db):
+    for cursor in ("ws_abc", "d:yesterday|ws_abc", "s:2026-01-01T00:00:00"):
+        with pytest.raises(HTTPException) as exc:
+            run(server.get_workspaces(Response(), limit=2, cursor=cursor, user=USER))
+        assert exc.value.status_code == 400
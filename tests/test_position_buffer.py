@@ -0,0 +1,87 @@
+"""
+Buffered card moves: board scoping, read-your-writes overlay and the flush on shutdown.
+"""
+
+import pytest
+from fastapi import Response
+
+import server
+
+from tests.conftest import USER, FakeRequest, run
+
+OTHER = {"user_id": "user_other", "email": "other@cardflow.test", "name": "Other User"}
+
+@pytest.fixture
+def buffer(monkeypatch):
+    buffer = server.PositionWriteBuffer(window_ms=50)
+    monkeypatch.setattr(server, "position_buffer", buffer)
+    return buffer
+
+def make_board(user: dict) -> dict:
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=user))
+    board = run(server.create_board(server.BoardCreate(name="Board", workspace_id=ws["workspace_id"]), user=user))
+    card = run(server.create_card(server.CardCreate(title="Card", board_id=board["board_id"], position_x=1, position_y=1), user=user))
+    return {"board_id": board["board_id"], "card_id": card["card_id"]}
+
+def positions(board_id: str, user: dict) -> dict:
+    cards = run(server.get_cards(board_id, FakeRequest(), Response(), bbox=None, limit=100, cursor=None, user=user))
+    return {card["card_id"]: (card["position_x"], card["position_y"]) for card in cards}
+
+def move(board_id: str, card_id: str, x: float, y: float, user: dict) -> dict:
+    return run(server.update_card_positions(board_id, [server.CardPosition(card_id=card_id, x=x, y=y)], user=user))
+
+def test_cards_from_other_boards_are_not_buffered(fake_db, buffer):
+    victim = make_board(USER)
+    attacker = make_board(OTHER)
+
+    assert move(attacker["board_id"], victim["card_id"], 9999, 9999, OTHER)["buffered"] == 0
+    assert positions(victim["board_id"], USER)[victim["card_id"]] == (1, 1)
+
+    # The owner's own move is buffered and reaches the database
+    assert move(victim["board_id"], victim["card_id"], 5, 6, USER)["buffered"] == 1
+    run(buffer.flush())
+    stored = next(c for c in fake_db.cards.docs if c["card_id"] == victim["card_id"])
+    assert (stored["position_x"], stored["position_y"]) == (5, 6)
+
+def test_entries_for_another_board_are_never_overlaid(fake_db, buffer):
+    victim = make_board(USER)
+    buffer.add(victim["card_id"], "board_elsewhere", {"position_x": 9999, "position_y": 9999})
+    assert positions(victim["board_id"], USER)[victim["card_id"]] == (1, 1)
+    buffer.add(victim["card_id"], victim["board_id"], {"position_x": 7, "position_y": 8})
+    run(buffer.flush())
+    stored = next(c for c in fake_db.cards.docs if c["card_id"] == victim["card_id"])
+    assert (stored["position_x"], stored["position_y"]) == (7, 8)
+
+def test_buffered_move_is_overlaid_then_flushed_on_stop(fake_db, buffer):
+    board = make_board(USER)
+    before = Response()
+    run(server.get_cards(board["board_id"], FakeRequest(), before, bbox=None, limit=100, cursor=None, user=USER))
+    version = fake_db.boards.docs[0]["version"]
+
+    move(board["board_id"], board["card_id"], 40, 50, USER)
+    stored = fake_db.cards.docs[0]
+    assert (stored["position_x"], stored["position_y"]) == (1, 1)
+    after = Response()
+    assert positions(board["board_id"], USER)[board["card_id"]] == (40, 50)
+    run(server.get_cards(board["board_id"], FakeRequest(), after, bbox=None, limit=100, cursor=None, user=USER))
+    # Buffered writes are part of the ETag before they reach the database
+    assert after.headers["ETag"] != before.headers["ETag"]
+
+    run(buffer.stop())
+    assert (stored["position_x"], stored["position_y"]) == (40, 50)
+    assert fake_db.boards.docs[0]["version"] == version + 1
+    assert not buffer.pending and buffer.stats()["flushed"] == 1
+
+def test_full_update_keeps_an_unflushed_move(fake_db, buffer):
+    board = make_board(USER)
+    move(board["board_id"], board["card_id"], 500, 600, USER)
+    updated = run(server.update_card(board["card_id"], server.CardUpdate(title="Renamed"), user=USER))
+    assert (updated["title"], updated["position_x"], updated["position_y"]) == ("Renamed", 500, 600)
+    stored = fake_db.cards.docs[0]
+    assert (stored["position_x"], stored["position_y"]) == (500, 600)
+
+    # An explicit position in the update still wins over the buffered one
+    move(board["board_id"], board["card_id"], 1, 2, USER)
+    run(server.update_card(board["card_id"], server.CardUpdate(title="Again", position_x=30), user=USER))
+    run(buffer.flush())
+    assert (stored["title"], stored["position_x"], stored["position_y"]) == ("Again", 30, 2)
@@ -0,0 +1,97 @@
+"""
+Sampled per-request Mongo accounting: Server-Timing header, slow-request log and query shapes.
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import metrics
+
+def traced_app(sample_rate: float, slow_ms: float) -> FastAPI:
+    """An app whose endpoint fires listener events from an executor thread, the way Motor does"""
+    listener = metrics.MongoCommandMetrics()
+    app = FastAPI()
+    app.add_middleware(metrics.TracingMiddleware, sample_rate=sample_rate, slow_ms=slow_ms)
+
+    def command(request_id: int, name: str, body: dict):
+        connection = ("db", 27017)
+        listener.started(SimpleNamespace(command={name: body.pop("collection"), **body}, command_name=name,
+                                         connection_id=connection, request_id=request_id))
+        listener.succeeded(SimpleNamespace(command_name=name, connection_id=connection, request_id=request_id,
+                                           duration_micros=2000))
+
+    @app.put("/api/cards/{card_id}")
+    async def update_card(card_id: str):
+        calls = [
+            ("find", {"collection": "cards", "filter": {"card_id": card_id}}),
+            ("find", {"collection": "boards", "filter": {"board_id": "board_secret", "owner_id": "user_1"}}),
+            ("findAndModify", {"collection": "cards", "query": {"card_id": card_id}, "update": {"$set": {"title": "x"}}}),
+            ("update", {"collection": "boards", "updates": [{"q": {"board_id": "board_secret"}, "u": {"$inc": {"version": 1}}}]}),
+        ]
+        loop = asyncio.get_running_loop()
+        for request_id, (name, body) in enumerate(calls):
+            fire = functools.partial(command, request_id, name, body)
+            await loop.run_in_executor(None, functools.partial(contextvars.copy_context().run, fire))
+        return {"card_id": card_id}
+
+    @app.get("/api/boards/{board_id}/events")
+    async def events(board_id: str):
+        async def stream():
+            yield b": connected\n\n"
+            # An open feed or a long export body, after the headers have gone out
+            await asyncio.sleep(0.2)
+            yield b"data: {}\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/api/slow")
+    async def slow():
+        await asyncio.sleep(0.2)
+        return {}
+
+    return app
+
+def test_sampled_request_gets_server_timing():
+    response = TestClient(traced_app(sample_rate=1, slow_ms=0)).put("/api/cards/card_1")
+    timing = response.headers["server-timing"]
+    assert 'db;desc="4 calls";dur=8.0' in timing
+    assert 'db.cards.find;desc="x1"' in timing and 'db.cards.findAndModify;desc="x1"' in timing
+    assert timing.startswith("app;dur=")
+
+def test_unsampled_request_has_no_header():
+    response = TestClient(traced_app(sample_rate=0, slow_ms=60000)).put("/api/cards/card_1")
+    assert "server-timing" not in response.headers
+
+def test_slow_requests_are_logged_with_query_shapes(caplog):
+    with caplog.at_level(logging.WARNING, logger="metrics"):
+        TestClient(traced_app(sample_rate=1, slow_ms=0.001)).put("/api/cards/card_1")
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["event"] == "slow_request" and entry["route"] == "/api/cards/{card_id}"
+    assert entry["db_calls"] == 4
+    shapes = [(q["collection"], q["command"], q["shape"]) for q in entry["queries"]]
+    assert shapes[1] == ("boards", "find", {"filter": {"board_id": "?", "owner_id": "?"}})
+    assert shapes[3] == ("boards", "update", {"q": {"board_id": "?"}, "n": 1})
+    # Shapes never carry the values themselves
+    assert "board_secret" not in caplog.text and "card_1" not in json.dumps(entry["queries"])
+
+def test_slow_log_without_sampling_omits_queries(caplog):
+    with caplog.at_level(logging.WARNING, logger="metrics"):
+        TestClient(traced_app(sample_rate=0, slow_ms=0.001)).put("/api/cards/card_1")
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["status"] == 200 and "queries" not in entry
+
+def test_slow_is_measured_to_the_response_headers(caplog):
+    client = TestClient(traced_app(sample_rate=0, slow_ms=100))
+    with caplog.at_level(logging.WARNING, logger="metrics"):
+        assert client.get("/api/boards/board_1/events").status_code == 200
+    assert not caplog.records
+    with caplog.at_level(logging.WARNING, logger="metrics"):
+        client.get("/api/slow")
+    assert json.loads(caplog.records[-1].getMessage())["route"] == "/api/slow"
@@ -0,0 +1,30 @@
+"""
+Card search modes: substring by default, and text search falling back when its index is missing.
+"""
+
+from fastapi import Response
+
+import server
+
+from tests.conftest import USER, run
+
+def seed() -> str:
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    board = run(server.create_board(server.BoardCreate(name="Board", workspace_id=ws["workspace_id"]), user=USER))
+    for title in ("Design review", "Redesign onboarding", "Budget"):
+        run(server.create_card(server.CardCreate(title=title, board_id=board["board_id"]), user=USER))
+    return board["board_id"]
+
+def search(q: str, **params) -> list:
+    params = {"board_id": None, "mode": "substring", "limit": 50, "cursor": None, **params}
+    return run(server.search_cards(q, Response(), user=USER, **params))
+
+def test_default_mode_matches_partial_words(fake_db):
+    seed()
+    route = next(r for r in server.app.routes if getattr(r, "path", None) == "/api/search")
+    assert next(p for p in route.dependant.query_params if p.name == "mode").default == "substring"
+    assert sorted(card["title"] for card in search("desig")) == ["Design review", "Redesign onboarding"]
+
+def test_text_mode_falls_back_to_substring_without_the_index(fake_db):
+    seed()
+    assert [card["title"] for card in search("budget", mode="text")] == ["Budget"]
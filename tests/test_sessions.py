@@ -0,0 +1,55 @@
+"""
+OAuth session lookup and the startup backfill of legacy string expiry dates.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+from tests.conftest import run
+
+@pytest.fixture(autouse=True)
+def oauth_user(fake_db):
+    fake_db.users.docs.append({"user_id": "user_oauth", "email": "oauth@cardflow.test", "name": "OAuth User"})
+
+def lookup(session_token: str) -> dict:
+    request = SimpleNamespace(cookies={"session_token": session_token}, headers={})
+    return run(server.get_current_user(request))
+
+def session(token: str, expires_at) -> dict:
+    return {"user_id": "user_oauth", "session_token": token, "expires_at": expires_at, "created_at": datetime.now(timezone.utc)}
+
+def test_expired_sessions_are_filtered_in_the_query(fake_db):
+    now = datetime.now(timezone.utc)
+    fake_db.user_sessions.docs += [session("live", now + timedelta(days=1)), session("expired", now - timedelta(seconds=1))]
+    assert lookup("live")["user_id"] == "user_oauth"
+    fake_db.ops.clear()
+    with pytest.raises(HTTPException) as exc:
+        lookup("expired")
+    assert exc.value.status_code == 401
+    # No user lookup for a session the filter already rejected
+    assert fake_db.ops["users.find_one"] == 0
+
+def test_backfill_converts_legacy_rows_and_drops_broken_ones(fake_db):
+    future = datetime.now(timezone.utc) + timedelta(days=1)
+    fake_db.user_sessions.docs += [
+        {**session("legacy", future.isoformat()), "_id": "oid_1"},
+        {**session("naive", future.replace(tzinfo=None).isoformat()), "_id": "oid_2"},
+        {**session("broken", "not a date"), "_id": "oid_3"},
+        {**session("missing", None), "_id": "oid_4"},
+    ]
+    # String dates never match the $gt filter, so legacy sessions stop working until converted
+    with pytest.raises(HTTPException):
+        lookup("legacy")
+
+    run(server.backfill_session_expiry())
+
+    tokens = {doc["session_token"]: doc["expires_at"] for doc in fake_db.user_sessions.docs}
+    assert set(tokens) == {"legacy", "naive"}
+    assert all(isinstance(value, datetime) and value.tzinfo for value in tokens.values())
+    assert lookup("legacy")["user_id"] == "user_oauth"
+    assert lookup("naive")["user_id"] == "user_oauth"
@@ -0,0 +1,132 @@
+"""
+Batched offline pushes: folding, conflict policy and write counts against the in-memory fake database.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+
+from tests.conftest import USER, run
+from tests.fake_db import FakeDatabase
+
+@pytest.fixture(autouse=True)
+def unique_ids(fake_db):
+    fake_db.cards.unique = [("card_id",)]
+    fake_db.links.unique = [("link_id",), ("source_card_id", "target_card_id")]
+
+def seed(fake: FakeDatabase) -> dict:
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    board = run(server.create_board(server.BoardCreate(name="Board", workspace_id=ws["workspace_id"]), user=USER))
+    card = run(server.create_card(server.CardCreate(title="Existing", board_id=board["board_id"]), user=USER))
+    fake.ops.clear()
+    return {"board_id": board["board_id"], "card": card}
+
+def op(n: int, entity: str, action: str, board_id: str, **fields) -> server.SyncOperation:
+    fields.setdefault("client_ts", datetime.now(timezone.utc))
+    return server.SyncOperation(op_id=f"op{n}", entity=entity, action=action, board_id=board_id, **fields)
+
+def push(*operations) -> dict:
+    return run(server.sync_push(server.SyncPush(operations=list(operations)), user=USER))
+
+def test_batch_folds_into_one_write_per_collection(fake_db):
+    state = seed(fake_db)
+    board_id, existing = state["board_id"], state["card"]["card_id"]
+    result = push(
+        op(1, "card", "create", board_id, id="card_offline1", data={"title": "Draft"}),
+        op(2, "card", "update", board_id, id="card_offline1", data={"title": "Final", "position_x": 5}),
+        op(3, "card", "update", board_id, id=existing, data={"status": "planned"}, base_version=0),
+        op(4, "card", "update", board_id, id=existing, data={"position_y": 9}, base_version=0),
+        op(5, "link", "create", board_id, id="link_offline1", data={"source_card_id": existing, "target_card_id": "card_offline1"}),
+    )
+    assert [r["status"] for r in result["results"]] == ["applied"] * 5
+    assert result["board_versions"] == {board_id: 2}
+    assert fake_db.ops["cards.bulk_write"] == 1 and fake_db.ops["links.bulk_write"] == 1
+    assert fake_db.ops["boards.find_one_and_update"] == 1
+
+    created = next(c for c in fake_db.cards.docs if c["card_id"] == "card_offline1")
+    assert created["title"] == "Final" and created["position_x"] == 5 and created["version"] == 0
+    updated = next(c for c in fake_db.cards.docs if c["card_id"] == existing)
+    # Both updates land as one write, so the version moves once
+    assert updated["status"] == "planned" and updated["position_y"] == 9 and updated["version"] == 1
+    assert fake_db.links.docs[0]["board_id"] == board_id
+
+def test_retried_push_is_idempotent(fake_db):
+    board_id = seed(fake_db)["board_id"]
+    operations = [
+        op(1, "card", "create", board_id, id="card_offline1", data={"title": "Draft"}),
+        op(2, "card", "create", board_id, id="card_offline2", data={"title": "Other"}),
+        op(3, "link", "create", board_id, id="link_offline1", data={"source_card_id": "card_offline1", "target_card_id": "card_offline2"}),
+    ]
+    push(*operations)
+    again = push(*operations)
+    assert [r["status"] for r in again["results"]] == ["duplicate"] * 3
+    assert again["board_versions"] == {}
+    assert len(fake_db.cards.docs) == 3 and len(fake_db.links.docs) == 1
+
+def test_conflicts_return_the_current_card(fake_db):
+    state = seed(fake_db)
+    board_id, existing = state["board_id"], state["card"]["card_id"]
+    run(server.update_card(existing, server.CardUpdate(title="Changed online"), user=USER))
+    earlier = datetime.now(timezone.utc) - timedelta(hours=1)
+    result = push(
+        op(1, "card", "update", board_id, id=existing, data={"title": "Offline"}, base_version=0),
+        op(2, "card", "update", board_id, id=existing, data={"title": "Offline"}, client_ts=earlier),
+        op(3, "card", "update", board_id, id="card_missing", data={"title": "Offline"}),
+    )
+    statuses = [r["status"] for r in result["results"]]
+    assert statuses == ["conflict", "stale", "not_found"]
+    assert result["results"][0]["current"]["title"] == "Changed online"
+    assert fake_db.ops["cards.bulk_write"] == 0
+
+def test_concurrent_change_between_load_and_write_is_a_conflict(fake_db):
+    state = seed(fake_db)
+    board_id, existing = state["board_id"], state["card"]["card_id"]
+    batch = server.SyncPushBatch(USER["user_id"], [
+        op(1, "card", "update", board_id, id=existing, data={"title": "Offline"}, base_version=0),
+    ])
+    run(batch.load())
+    run(server.update_card(existing, server.CardUpdate(title="Won the race"), user=USER))
+    result = run(batch.apply())
+    assert result["results"][0]["status"] == "conflict"
+    assert result["results"][0]["current"]["title"] == "Won the race"
+    assert fake_db.cards.docs[0]["title"] == "Won the race"
+
+def test_delete_cascades_links_and_records_tombstones(fake_db):
+    state = seed(fake_db)
+    board_id, existing = state["board_id"], state["card"]["card_id"]
+    result = push(
+        op(1, "card", "create", board_id, id="card_offline1", data={"title": "Keep"}),
+        op(2, "card", "create", board_id, id="card_offline2", data={"title": "Never synced"}),
+        op(3, "link", "create", board_id, id="link_offline1", data={"source_card_id": existing, "target_card_id": "card_offline1"}),
+        op(4, "card", "delete", board_id, id="card_offline2"),
+        op(5, "card", "delete", board_id, id=existing),
+    )
+    assert [r["status"] for r in result["results"]] == ["applied"] * 5
+    assert [c["card_id"] for c in fake_db.cards.docs] == ["card_offline1"]
+    assert not fake_db.links.docs
+    tombstones = sorted((t["kind"], t["id"]) for t in fake_db.tombstones.docs)
+    # The card created and deleted within the batch never existed server-side
+    assert tombstones == [("card", existing), ("link", "link_offline1")]
+    assert fake_db.ops["tombstones.insert_many"] == 1
+
+def test_ops_on_foreign_boards_are_rejected(fake_db):
+    seed(fake_db)
+    result = push(op(1, "card", "create", "board_someone_else", id="card_offline1", data={"title": "Nope"}))
+    assert result["results"][0]["status"] == "rejected"
+    assert result["applied"] == 0
+
+def test_cards_without_a_version_field_can_be_updated(fake_db):
+    state = seed(fake_db)
+    board_id = state["board_id"]
+    legacy = {**fake_db.cards.docs[0], "card_id": "card_legacy"}
+    legacy.pop("version")
+    fake_db.cards.docs.append(legacy)
+    result = push(
+        op(1, "card", "update", board_id, id="card_legacy", data={"title": "Synced"}, base_version=0),
+    )
+    assert result["results"][0]["status"] == "applied"
+    stored = next(c for c in fake_db.cards.docs if c["card_id"] == "card_legacy")
+    assert stored["title"] == "Synced" and stored["version"] == 1
+    assert push(op(2, "card", "delete", board_id, id="card_legacy", base_version=1))["results"][0]["status"] == "applied"
@@ -0,0 +1,77 @@
+"""
+Typeahead index cache: concurrent callers share one build, writes during a build are not lost, and
+writes from other workers are picked up through the board version.
+"""
+
+import asyncio
+
+import pytest
+
+import server
+
+from tests.conftest import USER, run
+
+@pytest.fixture
+def indexes(fake_db, monkeypatch):
+    indexes = server.SuggestIndexCache(max_boards=4)
+    monkeypatch.setattr(server, "suggest_indexes", indexes)
+    fake_db.cards.docs = [
+        {"card_id": f"card_{i}", "board_id": "board_1", "title": f"Design review {i}", "tags": []} for i in range(5)
+    ]
+    return indexes
+
+def test_concurrent_callers_wait_for_the_complete_index(fake_db, indexes):
+    async def keystroke():
+        # Search as soon as the index comes back, like the endpoint does
+        return len((await indexes.get("board_1", 0)).search("desig", 10))
+
+    async def keystrokes():
+        return await asyncio.gather(*(keystroke() for _ in range(3)))
+
+    assert asyncio.run(keystrokes()) == [5, 5, 5]
+    assert fake_db.ops["cards.find"] == 1
+
+def test_writes_during_a_build_are_replayed(fake_db, indexes):
+    async def build_while_writing():
+        build = asyncio.create_task(indexes.get("board_1", 0))
+        await asyncio.sleep(0)
+        # The cursor already holds card_3; deleting it now must not leave a ghost entry
+        indexes.remove_card("board_1", "card_3")
+        indexes.upsert_card({"card_id": "card_0", "board_id": "board_1", "title": "Renamed", "tags": []})
+        indexes.upsert_card({"card_id": "card_9", "board_id": "board_1", "title": "Design late", "tags": []})
+        return await build
+
+    index = asyncio.run(build_while_writing())
+    assert sorted(hit["card_id"] for hit in index.search("design", 10)) == ["card_1", "card_2", "card_4", "card_9"]
+    assert index.search("renamed", 10) == [{"card_id": "card_0", "title": "Renamed"}]
+    assert indexes.boards["board_1"] == (0, index) and not indexes.building
+
+def test_board_dropped_during_a_build_is_not_cached(fake_db, indexes):
+    async def build_then_drop():
+        build = asyncio.create_task(indexes.get("board_1", 0))
+        await asyncio.sleep(0)
+        indexes.drop("board_1")
+        return await build
+
+    asyncio.run(build_then_drop())
+    assert "board_1" not in indexes.boards
+
+def test_writes_from_another_worker_trigger_a_rebuild(fake_db, indexes):
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    board_id = run(server.create_board(server.BoardCreate(name="Board", workspace_id=ws["workspace_id"]), user=USER))["board_id"]
+    run(server.create_card(server.CardCreate(title="Roadmap", board_id=board_id), user=USER))
+
+    def suggest(q: str) -> list:
+        return [hit["title"] for hit in run(server.suggest_cards(board_id, q, limit=10, user=USER))]
+
+    assert suggest("road") == ["Roadmap"]
+    # This worker's own writes keep the index current without a rebuild
+    run(server.create_card(server.CardCreate(title="Roadshow", board_id=board_id), user=USER))
+    assert sorted(suggest("road")) == ["Roadmap", "Roadshow"]
+    assert indexes.builds == 1
+
+    # Another worker inserts a card and bumps the version; this worker never saw the write
+    fake_db.cards.docs.append({"card_id": "card_remote", "board_id": board_id, "title": "Road trip", "tags": []})
+    run(fake_db.boards.find_one_and_update({"board_id": board_id}, {"$inc": {"version": 1}}))
+    assert sorted(suggest("road")) == ["Road trip", "Roadmap", "Roadshow"]
+    assert indexes.builds == 2
@@ -0,0 +1,74 @@
+"""
+Resolved-user cache: hits, LRU eviction, and invalidation on logout and on OAuth profile updates.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+
+import server
+
+from tests.conftest import run
+
+class StubProvider:
+    def __init__(self):
+        self.profile = {"email": "oauth@cardflow.test", "name": "First Name", "session_token": "session_1"}
+
+    async def session_data(self, session_id: str) -> dict:
+        return dict(self.profile)
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = StubProvider()
+    monkeypatch.setattr(server, "auth_provider", provider)
+    return provider
+
+def with_cookie(token: str) -> SimpleNamespace:
+    return SimpleNamespace(cookies={"session_token": token}, headers={})
+
+def with_jwt(user_id: str) -> SimpleNamespace:
+    return SimpleNamespace(cookies={}, headers={"Authorization": f"Bearer {server.create_jwt_token(user_id)}"})
+
+def login(provider: StubProvider) -> dict:
+    request = SimpleNamespace(headers={"X-Session-ID": "oauth-session"}, cookies={})
+    return run(server.create_session(request, Response()))
+
+def test_repeat_lookups_are_served_from_the_cache(fake_db, provider):
+    user_id = login(provider)["user_id"]
+    fake_db.ops.clear()
+    for _ in range(3):
+        assert run(server.get_current_user(with_cookie("session_1")))["user_id"] == user_id
+        assert run(server.get_current_user(with_jwt(user_id)))["user_id"] == user_id
+    assert fake_db.ops["users.find_one"] == 2 and fake_db.ops["user_sessions.find_one"] == 1
+
+def test_logout_invalidates_the_cached_session(fake_db, provider):
+    login(provider)
+    run(server.get_current_user(with_cookie("session_1")))
+    run(server.logout(with_cookie("session_1"), Response()))
+    with pytest.raises(HTTPException) as exc:
+        run(server.get_current_user(with_cookie("session_1")))
+    assert exc.value.status_code == 401
+
+def test_profile_update_on_login_invalidates_every_cached_entry(fake_db, provider):
+    user_id = login(provider)["user_id"]
+    assert run(server.get_current_user(with_jwt(user_id)))["name"] == "First Name"
+    assert run(server.get_current_user(with_cookie("session_1")))["name"] == "First Name"
+
+    provider.profile.update(name="New Name", session_token="session_2")
+    login(provider)
+    assert run(server.get_current_user(with_jwt(user_id)))["name"] == "New Name"
+    assert run(server.get_current_user(with_cookie("session_2")))["name"] == "New Name"
+    # The old session was replaced, and its cache entry went with it
+    with pytest.raises(HTTPException):
+        run(server.get_current_user(with_cookie("session_1")))
+
+def test_least_recently_used_entries_are_evicted():
+    cache = server.UserCache(max_entries=2, ttl_seconds=30)
+    for n in range(3):
+        cache.set(("jwt", f"user_{n}"), {"user_id": f"user_{n}"})
+        cache.get(("jwt", "user_0"))
+    assert cache.get(("jwt", "user_0")) is not None
+    assert cache.get(("jwt", "user_1")) is None
+    assert cache.get(("jwt", "user_2")) is not None
+    assert cache.keys_by_user.keys() == {"user_0", "user_2"}
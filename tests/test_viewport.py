@@ -0,0 +1,46 @@
+"""
+Bounding-box filtering on the card, link and snapshot reads.
+"""
+
+import pytest
+from fastapi import HTTPException, Response
+
+import server
+
+from tests.conftest import USER, FakeRequest, run
+
+@pytest.fixture
+def board(fake_db):
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    board = run(server.create_board(server.BoardCreate(name="Board", workspace_id=ws["workspace_id"]), user=USER))
+    cards = {}
+    for name, x, y in (("in", 50, 50), ("edge", 100, 0), ("out", 500, 50), ("far", 900, 900)):
+        cards[name] = run(server.create_card(
+            server.CardCreate(title=name, board_id=board["board_id"], position_x=x, position_y=y), user=USER
+        ))["card_id"]
+    for source, target in (("in", "out"), ("out", "far"), ("far", "edge")):
+        run(server.create_link(server.LinkCreate(source_card_id=cards[source], target_card_id=cards[target]), user=USER))
+    return {"board_id": board["board_id"], "cards": cards}
+
+def titles(cards) -> set:
+    return {card["title"] for card in cards}
+
+def test_cards_inside_bbox_only(board):
+    cards = run(server.get_cards(board["board_id"], FakeRequest(), Response(), bbox="100,100,0,0", limit=100, cursor=None, user=USER))
+    assert titles(cards) == {"in", "edge"}
+
+def test_links_touching_bbox(board):
+    links = run(server.get_links(board["board_id"], FakeRequest(), Response(), bbox="0,0,100,100", limit=100, cursor=None, user=USER))
+    ids = board["cards"]
+    # in->out and far->edge touch the viewport; out->far does not
+    assert {(l["source_card_id"], l["target_card_id"]) for l in links} == {(ids["in"], ids["out"]), (ids["far"], ids["edge"])}
+
+def test_snapshot_with_bbox(board):
+    snapshot = run(server.get_board_snapshot(board["board_id"], FakeRequest(), Response(), bbox="0,0,100,100", user=USER))
+    assert titles(snapshot["cards"]) == {"in", "edge"}
+    assert len(snapshot["links"]) == 2
+
+def test_invalid_bbox(board):
+    with pytest.raises(HTTPException) as exc:
+        run(server.get_cards(board["board_id"], FakeRequest(), Response(), bbox="1,2,3", limit=100, cursor=None, user=USER))
+    assert exc.value.status_code == 400
@@ -0,0 +1,87 @@
+"""
+Mongo round trips per write endpoint, counted against an in-memory fake database.
+
+Handlers are called directly with an already resolved user, so auth lookups are
+not part of the counts.
+"""
+
+from collections import Counter
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+from tests.conftest import USER, run
+from tests.fake_db import FakeDatabase
+
+def seed(fake: FakeDatabase) -> dict:
+    """Create a workspace, board and two cards, then reset the op counter"""
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    board = run(server.create_board(server.BoardCreate(name="Board", workspace_id=ws["workspace_id"]), user=USER))
+    cards = [
+        run(server.create_card(server.CardCreate(title=f"Card {i}", board_id=board["board_id"]), user=USER))
+        for i in range(2)
+    ]
+    fake.ops.clear()
+    return {"workspace": ws, "board": board, "cards": cards}
+
+def total(fake: FakeDatabase) -> int:
+    return sum(fake.ops.values())
+
+def test_create_workspace_is_a_single_insert(fake_db):
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    assert "_id" not in ws
+    assert fake_db.ops == Counter({"workspaces.insert_one": 1})
+
+def test_create_board_skips_read_back(fake_db):
+    ws = run(server.create_workspace(server.WorkspaceCreate(name="WS"), user=USER))
+    fake_db.ops.clear()
+    board = run(server.create_board(server.BoardCreate(name="Board", workspace_id=ws["workspace_id"]), user=USER))
+    assert board["version"] == 0 and "_id" not in board
+    # ownership check + insert (was 3 with the read back)
+    assert total(fake_db) == 2
+    assert fake_db.ops["boards.find_one"] == 0
+
+def test_create_card_skips_read_back(fake_db):
+    state = seed(fake_db)
+    card = run(server.create_card(server.CardCreate(title="New", board_id=state["board"]["board_id"]), user=USER))
+    assert card["title"] == "New" and "_id" not in card
+    # ownership check + insert + version bump: 3, as before board versions existed, since the
+    # bump took the place of the dropped read-back
+    assert total(fake_db) == 3
+    assert fake_db.ops["cards.find_one"] == 0
+
+def test_update_card_returns_post_image(fake_db):
+    state = seed(fake_db)
+    card_id = state["cards"][0]["card_id"]
+    updated = run(server.update_card(card_id, server.CardUpdate(title="Renamed"), user=USER))
+    assert updated["title"] == "Renamed" and "_id" not in updated
+    # card lookup + ownership check + find_one_and_update + version bump. That is 4, the same as
+    # before board versions existed: dropping the read-back only pays for the bump, so this
+    # endpoint makes no fewer round trips than the original update_one + find_one version
+    assert total(fake_db) == 4
+    assert fake_db.ops["cards.update_one"] == 0
+    assert fake_db.ops["cards.find_one"] == 1
+
+def test_create_link_validates_in_one_round_trip(fake_db):
+    state = seed(fake_db)
+    source, target = (card["card_id"] for card in state["cards"])
+    board_id = state["board"]["board_id"]
+    link = run(server.create_link(server.LinkCreate(source_card_id=source, target_card_id=target, board_id=board_id), user=USER))
+    assert link["board_id"] == board_id and "_id" not in link
+    # one $in card lookup alongside the ownership check, then insert + version bump (was 6)
+    assert fake_db.ops == Counter({
+        "cards.find": 1, "boards.find_one": 1, "links.insert_one": 1, "boards.find_one_and_update": 1
+    })
+
+def test_create_link_maps_duplicate_key_to_400(fake_db):
+    fake_db.links.unique = [("source_card_id", "target_card_id")]
+    state = seed(fake_db)
+    source, target = (card["card_id"] for card in state["cards"])
+    data = server.LinkCreate(source_card_id=source, target_card_id=target, board_id=state["board"]["board_id"])
+    run(server.create_link(data, user=USER))
+    with pytest.raises(HTTPException) as exc:
+        run(server.create_link(data, user=USER))
+    assert exc.value.status_code == 400 and exc.value.detail == "Link already exists"
+    assert len(fake_db.links.docs) == 1